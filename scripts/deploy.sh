@@ -9,6 +9,10 @@ cd "$(dirname "$0")/.."
 LIBRARY_PATH="/home/guest/library"
 
 echo "Deploying Python scripts to ui-box..."
-scp src/ui.py src/search.py ui-box:$LIBRARY_PATH/
+scp src/ui.py src/search.py src/autocomplete.py src/snapshot.py src/search_daemon.py ui-box:$LIBRARY_PATH/
+scp src/db/maintain.py ui-box:$LIBRARY_PATH/db/
+
+echo "Rebuilding catalog snapshot on ui-box..."
+ssh ui-box "cd $LIBRARY_PATH && python3 snapshot.py --db db/library.db --out db/library.snap"
 
 echo "Code deployed to ui-box successfully."
@@ -19,9 +19,39 @@ fi
 LIBRARY_PATH="/home/guest/library"
 
 echo "Syncing Python scripts..."
-scp src/ui.py src/search.py ui-box:$LIBRARY_PATH/
+scp src/ui.py src/search.py src/autocomplete.py src/snapshot.py src/search_daemon.py ui-box:$LIBRARY_PATH/
+scp src/db/maintain.py ui-box:$LIBRARY_PATH/db/
+
+echo "Building optimized catalog..."
+python3 src/db/build_catalog.py --db src/db/library.db --out src/db/catalog.db
+CHECKSUM=$(python3 -c "import json; print(json.load(open('src/db/catalog.db.manifest.json'))['sha256'])")
 
 echo "Syncing database..."
-scp src/db/library.db ui-box:$LIBRARY_PATH/db/
+scp src/db/catalog.db ui-box:$LIBRARY_PATH/db/library.db.new
+# Replacing the file under an open WAL-mode connection (the search daemon,
+# a running UI) lets its -wal file be replayed onto the new database, so
+# refuse while one may be open. The new file keeps the old journal mode.
+ssh ui-box bash -s <<EOF
+set -e
+cd $LIBRARY_PATH/db
+echo '$CHECKSUM  library.db.new' | sha256sum -c --quiet
+if pgrep -f search_daemon.py > /dev/null; then
+    echo "Error: the search daemon is running; stop it and run full-sync again"
+    exit 1
+fi
+if [ -e library.db-wal ] || [ -e library.db-shm ]; then
+    echo "Error: library.db is still open (library.db-wal exists); close the UI and run full-sync again"
+    exit 1
+fi
+MODE=\$(python3 -c "import sqlite3; print(sqlite3.connect('library.db').execute('PRAGMA journal_mode').fetchone()[0])")
+mv library.db.new library.db
+rm -f library.db-wal library.db-shm
+if [ "\$MODE" = wal ]; then
+    python3 -c "import sqlite3; sqlite3.connect('library.db').execute('PRAGMA journal_mode=WAL')"
+fi
+EOF
+
+echo "Rebuilding catalog snapshot on ui-box..."
+ssh ui-box "cd $LIBRARY_PATH && python3 snapshot.py --db db/library.db --out db/library.snap"
 
 echo "Full sync complete."
@@ -16,4 +16,7 @@ LIBRARY_PATH="/home/guest/library"
 echo "Generating SQL from output.json..."
 python3 src/db/json_to_sql.py src/data/output.json | ssh ui-box "sqlite3 $LIBRARY_PATH/db/library.db"
 
+echo "Rebuilding catalog snapshot on ui-box..."
+ssh ui-box "cd $LIBRARY_PATH && python3 snapshot.py --db db/library.db --out db/library.snap"
+
 echo "Books pushed to ui-box successfully."
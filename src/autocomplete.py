@@ -0,0 +1,153 @@
+"""
+Autocomplete for the search input.
+
+Keeps a sorted array of normalized title and author prefixes, each with a
+popularity weight (number of books, plus a bump every time a suggestion is
+searched for). A keystroke is a binary search for the prefix range and a
+top-N pick over it, with results cached per prefix until the index changes.
+"""
+
+import heapq
+import re
+import sqlite3
+import unicodedata
+from bisect import bisect_left
+
+
+# Suggestions shown under the input line
+DEFAULT_LIMIT = 5
+
+# Weight added when a suggestion is actually searched for
+USE_WEIGHT = 1
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", text.casefold()))
+
+
+class PrefixIndex:
+    """Sorted array of (key, display) pairs with weights, for one field."""
+
+    def __init__(self):
+        self.keys = []          # sorted normalized keys
+        self.displays = []      # display text for each key, same order
+        self.weights = {}       # display text -> weight
+        self.normalized = {}    # display text -> normalized display text
+        self.cache = {}         # normalized prefix -> suggestions
+
+    def word_keys(self, display: str) -> list[str]:
+        """Keys for a new value: one from every word, so "orw" finds "George Orwell"."""
+        self.normalized[display] = normalize(display)
+        words = self.normalized[display].split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def add(self, display: str, weight: int = 1) -> None:
+        """Add a value, or increase its weight if already present."""
+        if display in self.weights:
+            self.weights[display] += weight
+        else:
+            self.weights[display] = weight
+            for key in self.word_keys(display):
+                pos = bisect_left(self.keys, key)
+                self.keys.insert(pos, key)
+                self.displays.insert(pos, display)
+        self.cache.clear()
+
+    def add_many(self, displays: list[str]) -> None:
+        """
+        Add many values at once, each occurrence adding 1 to its weight.
+
+        New keys are appended and the arrays sorted once, instead of an
+        insert per key as add() does.
+        """
+        entries = []
+        for display in displays:
+            if display in self.weights:
+                self.weights[display] += 1
+            else:
+                self.weights[display] = 1
+                entries.extend((key, display) for key in self.word_keys(display))
+        if entries:
+            entries.extend(zip(self.keys, self.displays))
+            entries.sort()
+            self.keys = [key for key, _ in entries]
+            self.displays = [display for _, display in entries]
+        self.cache.clear()
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list[str]:
+        """
+        Return up to `limit` values with a word starting with prefix.
+
+        Heaviest first; on equal weight, values that start with the prefix
+        come before those matching a later word.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self.cache:
+            return self.cache[prefix][:limit]
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\U0010ffff")
+        matches = set(self.displays[lo:hi])
+        suggestions = heapq.nsmallest(
+            max(limit, DEFAULT_LIMIT), matches,
+            key=lambda d: (-self.weights[d], not self.normalized[d].startswith(prefix),
+                           d.casefold())
+        )
+        self.cache[prefix] = suggestions
+        return suggestions[:limit]
+
+
+class Autocomplete:
+    """Title and author suggestions, kept up to date incrementally."""
+
+    def __init__(self):
+        self.indexes = {"title": PrefixIndex(), "author": PrefixIndex()}
+        self.last_book_id = 0
+        self.last_link = (0, 0)
+
+    def update(self, conn: sqlite3.Connection) -> int:
+        """
+        Add books and authors added to the database since the last update.
+
+        Returns the number of new entries indexed.
+        """
+        titles = []
+        for book_id, title in conn.execute(
+            "SELECT id, title FROM books WHERE id > ? ORDER BY id", (self.last_book_id,)
+        ):
+            titles.append(title.strip())
+            self.last_book_id = book_id
+
+        # Author weight is the number of books, one per book_authors row
+        names = []
+        for book_id, author_id, name in conn.execute("""
+            SELECT ba.book_id, ba.author_id, a.name
+            FROM book_authors ba
+            JOIN authors a ON a.id = ba.author_id
+            WHERE (ba.book_id, ba.author_id) > (?, ?)
+            ORDER BY ba.book_id, ba.author_id
+        """, self.last_link):
+            names.append(name.strip())
+            self.last_link = (book_id, author_id)
+
+        self.indexes["title"].add_many(titles)
+        self.indexes["author"].add_many(names)
+        return len(titles) + len(names)
+
+    def suggest(self, field: str, prefix: str, limit: int = DEFAULT_LIMIT) -> list[str]:
+        """Return suggestions for a field ('title' or 'author')."""
+        index = self.indexes.get(field)
+        if index is None:
+            return []
+        return index.suggest(prefix, limit)
+
+    def record_use(self, field: str, term: str) -> None:
+        """Boost a value that was searched for, if it is a known suggestion."""
+        index = self.indexes.get(field)
+        if index is not None and term in index.weights:
+            index.add(term, USE_WEIGHT)
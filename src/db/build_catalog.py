@@ -0,0 +1,233 @@
+"""
+Build an optimized read-only catalog database for deployment.
+
+The working database carries whatever page layout and fragmentation
+ingestion left behind and has no planner statistics. This script copies
+it into a fresh database, keeping all ids, optimizes the FTS indexes,
+runs ANALYZE, writes the result with VACUUM INTO, checks its integrity,
+and writes a manifest with checksums and stats next to it.
+
+Usage:
+    python build_catalog.py [--db library.db] [--out catalog.db] [--page-size 4096]
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from init_db import FACETS_PATH, SCHEMA_PATH
+from migrate_book_details import needs_migration
+
+
+DEFAULT_DB_PATH = Path(__file__).parent / "library.db"
+DEFAULT_OUT_PATH = Path(__file__).parent / "catalog.db"
+DEFAULT_PAGE_SIZE = 4096
+
+# Tables counted in the manifest
+MANIFEST_TABLES = [
+    "books", "book_details", "authors", "publishers",
+    "book_authors", "book_publishers", "borrowers", "borrows",
+]
+
+
+# Columns copied into the catalog, per table
+COPY_COLUMNS = {
+    "books": ["id", "isbn", "title", "publication_year", "created_at"],
+    "book_details": ["book_id", "publication_date", "description",
+                     "description_compressed", "open_library_key"],
+    "authors": ["id", "name"],
+    "publishers": ["id", "name"],
+    "book_authors": ["book_id", "author_id"],
+    "book_publishers": ["book_id", "publisher_id"],
+    "borrowers": ["id", "name", "contact_info", "created_at"],
+    "borrows": ["id", "book_id", "borrower_id", "borrow_date", "due_date", "return_date",
+                "extensions", "notes", "created_at"],
+}
+
+
+def copy_tables(src: sqlite3.Connection, dst: sqlite3.Connection) -> None:
+    """
+    Copy all rows from src into dst, keeping their ids.
+
+    Ids are referenced from outside the database (snapshots, the UI's
+    detail cache, borrowing records), so the catalog must not renumber
+    them; the fresh file and VACUUM INTO do the compacting.
+    """
+    for table, columns in COPY_COLUMNS.items():
+        column_list = ", ".join(columns)
+        placeholders = ", ".join("?" * len(columns))
+        rows = src.execute(f"SELECT {column_list} FROM {table} ORDER BY {columns[0]}")
+        dst.executemany(
+            f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", rows
+        )
+
+
+def check_integrity(conn: sqlite3.Connection) -> list[str]:
+    """Run SQLite and FTS integrity checks. Returns a list of problems."""
+    problems = [row[0] for row in conn.execute("PRAGMA integrity_check") if row[0] != "ok"]
+    problems += [f"foreign key violation in {row[0]}" for row in conn.execute("PRAGMA foreign_key_check")]
+    for fts in ("books_fts", "authors_fts"):
+        try:
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES('integrity-check')")
+        except sqlite3.DatabaseError as e:
+            problems.append(f"{fts}: {e}")
+    return problems
+
+
+def sha256(path: Path) -> str:
+    """Checksum a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(src_path: Path, out_path: Path, seconds: float) -> dict:
+    """Collect checksums and stats for the built catalog."""
+    conn = sqlite3.connect(out_path)
+    try:
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                  for t in MANIFEST_TABLES}
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        "file": out_path.name,
+        "sha256": sha256(out_path),
+        "size_bytes": out_path.stat().st_size,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "row_counts": counts,
+        "source": {
+            "file": src_path.name,
+            "sha256": sha256(src_path),
+            "size_bytes": src_path.stat().st_size,
+        },
+        "sqlite_version": sqlite3.sqlite_version,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "build_seconds": round(seconds, 3),
+    }
+
+
+def build_catalog(src_path: Path, out_path: Path, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Build the deployment catalog and its manifest.
+
+    Returns the manifest. Raises ValueError if the catalog would overwrite
+    the source or the source still has the old books layout, RuntimeError
+    if the integrity check fails.
+    """
+    start = time.perf_counter()
+    work_path = out_path.with_suffix(".build")
+    for path in (out_path, work_path):
+        if path.exists() and path.samefile(src_path):
+            raise ValueError(f"{path} is the source database; choose another --out")
+
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    if needs_migration(src):
+        src.close()
+        raise ValueError(f"{src_path} uses the old books layout; "
+                         "run migrate_book_details.py first")
+
+    work_path.unlink(missing_ok=True)
+    out_path.unlink(missing_ok=True)
+
+    with open(SCHEMA_PATH, "r") as f:
+        schema_sql = f.read()
+    with open(FACETS_PATH, "r") as f:
+        facets_sql = f.read()
+
+    dst = sqlite3.connect(work_path)
+    try:
+        # Scratch file: rebuilt from scratch on failure, so skip durability
+        dst.execute(f"PRAGMA page_size = {int(page_size)}")
+        dst.execute("PRAGMA journal_mode = OFF")
+        dst.execute("PRAGMA synchronous = OFF")
+        dst.executescript(schema_sql)
+        dst.executescript(facets_sql)
+
+        with dst:
+            copy_tables(src, dst)
+
+        with dst:
+            dst.execute("INSERT INTO books_fts(books_fts) VALUES('optimize')")
+            dst.execute("INSERT INTO authors_fts(authors_fts) VALUES('optimize')")
+        dst.execute("ANALYZE")
+        dst.execute("VACUUM INTO ?", (str(out_path),))
+    finally:
+        src.close()
+        dst.close()
+        work_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(out_path)
+    try:
+        problems = check_integrity(conn)
+    finally:
+        conn.close()
+    if problems:
+        out_path.unlink()
+        raise RuntimeError("Integrity check failed: " + "; ".join(problems))
+
+    manifest = build_manifest(src_path, out_path, time.perf_counter() - start)
+    manifest_path = out_path.with_name(out_path.name + ".manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Build an optimized read-only catalog database for deployment."
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Source database (default: {DEFAULT_DB_PATH})"
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=DEFAULT_OUT_PATH,
+        help=f"Catalog to write (default: {DEFAULT_OUT_PATH})"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"SQLite page size in bytes (default: {DEFAULT_PAGE_SIZE})"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: Database not found at {args.db}")
+        sys.exit(1)
+
+    try:
+        manifest = build_catalog(args.db, args.out, args.page_size)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Built {args.out} ({manifest['size_bytes'] / 1024:.0f} KiB, "
+          f"{manifest['page_count']} pages of {manifest['page_size']} bytes)")
+    print(f"Books: {manifest['row_counts']['books']}  "
+          f"Authors: {manifest['row_counts']['authors']}")
+    print(f"SHA-256: {manifest['sha256']}")
+
+
+if __name__ == "__main__":
+    main()
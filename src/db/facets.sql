@@ -0,0 +1,91 @@
+-- Facet count tables
+-- Precomputed per-year, per-decade, per-author and per-publisher book
+-- counts, kept in sync by triggers so navigation never needs a GROUP BY.
+-- Books without a publication year are not counted in the year facets.
+
+-- =============================================================================
+-- AGGREGATE TABLES
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS year_counts (
+    year INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS decade_counts (
+    decade INTEGER PRIMARY KEY,      -- e.g. 1990 for 1990-1999
+    count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS author_counts (
+    author_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS publisher_counts (
+    publisher_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+-- "Top authors/publishers" lists read these in count order
+CREATE INDEX IF NOT EXISTS idx_author_counts_count ON author_counts(count);
+CREATE INDEX IF NOT EXISTS idx_publisher_counts_count ON publisher_counts(count);
+
+-- =============================================================================
+-- TRIGGERS to keep the counts synchronized
+-- =============================================================================
+
+-- Year and decade counts
+CREATE TRIGGER IF NOT EXISTS year_counts_insert AFTER INSERT ON books
+WHEN new.publication_year IS NOT NULL BEGIN
+    INSERT INTO year_counts (year, count) VALUES (new.publication_year, 1)
+        ON CONFLICT(year) DO UPDATE SET count = count + 1;
+    INSERT INTO decade_counts (decade, count) VALUES (new.publication_year / 10 * 10, 1)
+        ON CONFLICT(decade) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS year_counts_delete AFTER DELETE ON books
+WHEN old.publication_year IS NOT NULL BEGIN
+    UPDATE year_counts SET count = count - 1 WHERE year = old.publication_year;
+    DELETE FROM year_counts WHERE year = old.publication_year AND count <= 0;
+    UPDATE decade_counts SET count = count - 1 WHERE decade = old.publication_year / 10 * 10;
+    DELETE FROM decade_counts WHERE decade = old.publication_year / 10 * 10 AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS year_counts_update_old AFTER UPDATE OF publication_year ON books
+WHEN old.publication_year IS NOT NULL BEGIN
+    UPDATE year_counts SET count = count - 1 WHERE year = old.publication_year;
+    DELETE FROM year_counts WHERE year = old.publication_year AND count <= 0;
+    UPDATE decade_counts SET count = count - 1 WHERE decade = old.publication_year / 10 * 10;
+    DELETE FROM decade_counts WHERE decade = old.publication_year / 10 * 10 AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS year_counts_update_new AFTER UPDATE OF publication_year ON books
+WHEN new.publication_year IS NOT NULL BEGIN
+    INSERT INTO year_counts (year, count) VALUES (new.publication_year, 1)
+        ON CONFLICT(year) DO UPDATE SET count = count + 1;
+    INSERT INTO decade_counts (decade, count) VALUES (new.publication_year / 10 * 10, 1)
+        ON CONFLICT(decade) DO UPDATE SET count = count + 1;
+END;
+
+-- Author counts
+CREATE TRIGGER IF NOT EXISTS author_counts_insert AFTER INSERT ON book_authors BEGIN
+    INSERT INTO author_counts (author_id, count) VALUES (new.author_id, 1)
+        ON CONFLICT(author_id) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS author_counts_delete AFTER DELETE ON book_authors BEGIN
+    UPDATE author_counts SET count = count - 1 WHERE author_id = old.author_id;
+    DELETE FROM author_counts WHERE author_id = old.author_id AND count <= 0;
+END;
+
+-- Publisher counts
+CREATE TRIGGER IF NOT EXISTS publisher_counts_insert AFTER INSERT ON book_publishers BEGIN
+    INSERT INTO publisher_counts (publisher_id, count) VALUES (new.publisher_id, 1)
+        ON CONFLICT(publisher_id) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS publisher_counts_delete AFTER DELETE ON book_publishers BEGIN
+    UPDATE publisher_counts SET count = count - 1 WHERE publisher_id = old.publisher_id;
+    DELETE FROM publisher_counts WHERE publisher_id = old.publisher_id AND count <= 0;
+END;
@@ -13,6 +13,7 @@ from pathlib import Path
 # Default database location (can be overridden via command line)
 DEFAULT_DB_PATH = Path(__file__).parent / "library.db"
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+FACETS_PATH = Path(__file__).parent / "facets.sql"
 
 
 def confirm_overwrite(db_path: Path) -> bool:
@@ -25,17 +26,20 @@ def confirm_overwrite(db_path: Path) -> bool:
 
 
 def create_database(db_path: Path, schema_path: Path) -> None:
-    """Create the database from the schema file."""
+    """Create the database from the schema file and the facet count tables."""
     print(f"Creating database at {db_path}")
 
     # Read the schema
     with open(schema_path, "r") as f:
         schema_sql = f.read()
+    with open(FACETS_PATH, "r") as f:
+        facets_sql = f.read()
 
     # Connect and execute schema
     conn = sqlite3.connect(db_path)
     try:
         conn.executescript(schema_sql)
+        conn.executescript(facets_sql)
         conn.commit()
         print("Database created successfully.")
     finally:
@@ -4,13 +4,16 @@ Convert book JSON data to SQL insert statements.
 Usage:
     python json_to_sql.py input.json > inserts.sql
     python json_to_sql.py input.json | sqlite3 library.db
+    python json_to_sql.py --compress input.json | sqlite3 library.db
 
 Reads JSON from a file and outputs SQL INSERT statements to stdout.
+With --compress, descriptions are stored zlib-compressed.
 """
 
 import json
 import re
 import sys
+import zlib
 from pathlib import Path
 
 
@@ -37,7 +40,14 @@ def extract_year(date_str: str) -> int | None:
     return None
 
 
-def generate_book_sql(book: dict) -> list[str]:
+def description_sql(description: str, compress: bool) -> tuple[str, int]:
+    """Return the SQL literal for a description and its compressed flag."""
+    if compress and description:
+        return f"X'{zlib.compress(description.encode('utf-8')).hex()}'", 1
+    return f"'{escape_sql(description)}'", 0
+
+
+def generate_book_sql(book: dict, compress: bool = False) -> list[str]:
     """Generate SQL statements for a single book."""
     statements = []
 
@@ -45,15 +55,21 @@ def generate_book_sql(book: dict) -> list[str]:
     title = escape_sql(book.get("title", ""))
     pub_date = escape_sql(book.get("publication_date", ""))
     pub_year = extract_year(book.get("publication_date", ""))
-    description = escape_sql(book.get("description", ""))
+    description, compressed = description_sql(book.get("description", ""), compress)
     ol_key = escape_sql(book.get("open_library_key", ""))
 
     pub_year_sql = str(pub_year) if pub_year else "NULL"
 
-    # Insert book
+    # Insert book (hot columns) and its details (cold columns)
     statements.append(
-        f"INSERT OR IGNORE INTO books (isbn, title, publication_date, publication_year, description, open_library_key) "
-        f"VALUES ('{isbn}', '{title}', '{pub_date}', {pub_year_sql}, '{description}', '{ol_key}');"
+        f"INSERT OR IGNORE INTO books (isbn, title, publication_year) "
+        f"VALUES ('{isbn}', '{title}', {pub_year_sql});"
+    )
+    statements.append(
+        f"INSERT OR IGNORE INTO book_details "
+        f"(book_id, publication_date, description, description_compressed, open_library_key) "
+        f"SELECT id, '{pub_date}', {description}, {compressed}, '{ol_key}' "
+        f"FROM books WHERE isbn = '{isbn}';"
     )
 
     # Insert authors and link to book
@@ -83,7 +99,7 @@ def generate_book_sql(book: dict) -> list[str]:
     return statements
 
 
-def json_to_sql(books: list[dict]) -> str:
+def json_to_sql(books: list[dict], compress: bool = False) -> str:
     """Convert a list of book dicts to SQL statements."""
     lines = [
         "-- Auto-generated SQL insert statements",
@@ -99,7 +115,7 @@ def json_to_sql(books: list[dict]) -> str:
     for book in books:
         isbn = book.get("isbn", "unknown")
         lines.append(f"-- Book: {isbn}")
-        lines.extend(generate_book_sql(book))
+        lines.extend(generate_book_sql(book, compress))
         lines.append("")
 
     lines.append("COMMIT;")
@@ -108,12 +124,17 @@ def json_to_sql(books: list[dict]) -> str:
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python json_to_sql.py <input.json>", file=sys.stderr)
+    args = sys.argv[1:]
+    compress = "--compress" in args
+    if compress:
+        args.remove("--compress")
+
+    if len(args) < 1:
+        print("Usage: python json_to_sql.py [--compress] <input.json>", file=sys.stderr)
         print("       python json_to_sql.py <input.json> | sqlite3 library.db", file=sys.stderr)
         sys.exit(1)
 
-    input_path = Path(sys.argv[1])
+    input_path = Path(args[0])
 
     if not input_path.exists():
         print(f"Error: File not found: {input_path}", file=sys.stderr)
@@ -126,7 +147,7 @@ def main():
         print("Error: JSON must be an array of books", file=sys.stderr)
         sys.exit(1)
 
-    sql = json_to_sql(books)
+    sql = json_to_sql(books, compress)
     print(sql)
 
 
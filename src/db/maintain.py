@@ -0,0 +1,305 @@
+"""
+Routine maintenance for the library database.
+
+Trigger-driven inserts and deletes leave the FTS indexes spread over many
+small segments, planner statistics go stale as books are added, and
+deleted rows leave free pages behind. This script reports on all three,
+then works through the fixes within a time budget:
+
+- FTS merge: merges segments a few pages at a time until each index is a
+  single segment (the same result as 'optimize', in small steps)
+- ANALYZE when sqlite_stat1 is missing or stale, then PRAGMA optimize
+- Incremental vacuum, when the database uses auto_vacuum=INCREMENTAL
+- A passive WAL checkpoint, when the database is in WAL mode
+
+Every step runs in its own short transaction with a busy timeout, so it is
+safe to schedule on ui-box while the UI is reading: readers wait at most
+one step, and a step that cannot get the lock is skipped until next time.
+
+Usage:
+    python maintain.py [--db library.db] [--budget 30] [--report-only]
+    python maintain.py --enable-incremental-vacuum   # one-time, UI stopped
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+
+DEFAULT_DB_PATH = Path(__file__).parent / "library.db"
+
+FTS_TABLES = ["books_fts", "authors_fts"]
+
+# Seconds to spend on maintenance steps
+DEFAULT_BUDGET = 30.0
+
+# Seconds to wait for readers before giving up on a step
+BUSY_TIMEOUT = 5.0
+
+# Pages written per FTS merge step (negative merges all segment levels)
+MERGE_PAGES = 64
+
+# Free pages returned per incremental vacuum step
+VACUUM_PAGES = 256
+
+# Re-analyze when a table's row count has drifted this far from sqlite_stat1
+STAT_DRIFT = 0.10
+
+# Rows sampled per index by ANALYZE
+ANALYSIS_LIMIT = 1000
+
+# Largest tables and indexes listed in the report
+REPORT_SIZES = 12
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def pragma(conn: sqlite3.Connection, name: str):
+    """Return the value of a single-valued pragma."""
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def fts_segments(conn: sqlite3.Connection, table: str) -> int:
+    """Number of segments in an FTS5 index."""
+    return conn.execute(f"SELECT COUNT(DISTINCT segid) FROM {table}_idx").fetchone()[0]
+
+
+def object_sizes(conn: sqlite3.Connection) -> dict[str, dict] | None:
+    """
+    Pages, bytes and unused bytes for each table and index.
+
+    Returns None if SQLite was built without the dbstat table.
+    """
+    try:
+        rows = conn.execute("""
+            SELECT name, COUNT(*), SUM(pgsize), SUM(unused)
+            FROM dbstat
+            GROUP BY name
+            ORDER BY SUM(pgsize) DESC
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return {name: {"pages": pages, "bytes": size, "unused": unused}
+            for name, pages, size, unused in rows}
+
+
+def stale_statistics(conn: sqlite3.Connection) -> list[str]:
+    """
+    Tables whose sqlite_stat1 row count is missing or has drifted.
+
+    Only tables with indexes are checked; ANALYZE records nothing for others.
+    """
+    has_stat1 = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    recorded = {}
+    if has_stat1:
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            recorded[table] = int(stat.split()[0])
+
+    stale = []
+    tables = conn.execute("""
+        SELECT DISTINCT tbl_name FROM sqlite_master
+        WHERE type = 'index' AND tbl_name NOT LIKE 'sqlite_%'
+    """).fetchall()
+    for (table,) in tables:
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        if table not in recorded:
+            if rows:
+                stale.append(table)
+        elif abs(rows - recorded[table]) > STAT_DRIFT * max(recorded[table], 1):
+            stale.append(table)
+    return stale
+
+
+def report(conn: sqlite3.Connection) -> dict:
+    """Collect the health of the database."""
+    page_count = pragma(conn, "page_count")
+    freelist = pragma(conn, "freelist_count")
+    return {
+        "page_size": pragma(conn, "page_size"),
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "free_percent": 100.0 * freelist / page_count if page_count else 0.0,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(pragma(conn, "auto_vacuum"), "unknown"),
+        "journal_mode": pragma(conn, "journal_mode"),
+        "fts_segments": {t: fts_segments(conn, t) for t in FTS_TABLES},
+        "stale_statistics": stale_statistics(conn),
+        "sizes": object_sizes(conn),
+    }
+
+
+def print_report(stats: dict) -> None:
+    """Print a database health report."""
+    print(f"Pages:        {stats['page_count']} x {stats['page_size']} bytes "
+          f"({stats['page_count'] * stats['page_size'] / 1024:.0f} KiB)")
+    print(f"Free pages:   {stats['freelist_count']} ({stats['free_percent']:.1f}%), "
+          f"auto_vacuum={stats['auto_vacuum']}")
+    print(f"Journal:      {stats['journal_mode']}")
+    for table, segments in stats["fts_segments"].items():
+        print(f"FTS segments: {table} {segments}")
+    if stats["stale_statistics"]:
+        print(f"Statistics:   stale for {', '.join(stats['stale_statistics'])}")
+    else:
+        print("Statistics:   up to date")
+
+    if stats["sizes"] is None:
+        print("Sizes:        n/a (SQLite built without dbstat)")
+        return
+    print("Largest tables and indexes:")
+    for name, size in list(stats["sizes"].items())[:REPORT_SIZES]:
+        unused = 100.0 * size["unused"] / size["bytes"] if size["bytes"] else 0.0
+        print(f"  {name:<36} {size['bytes'] / 1024:>8.0f} KiB  "
+              f"{size['pages']:>6} pages  {unused:>5.1f}% unused")
+
+
+def merge_fts(conn: sqlite3.Connection, table: str, deadline: float) -> str:
+    """Merge FTS segments in small steps until one is left or time runs out."""
+    steps = 0
+    while time.monotonic() < deadline:
+        before = conn.total_changes
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES('merge', ?)", (-MERGE_PAGES,))
+        steps += 1
+        # Fewer than two changes means there was nothing left to merge
+        if conn.total_changes - before < 2:
+            return f"{steps} merge step(s), {fts_segments(conn, table)} segment(s) left"
+    return f"out of time after {steps} merge step(s), {fts_segments(conn, table)} segment(s) left"
+
+
+def update_statistics(conn: sqlite3.Connection) -> str:
+    """ANALYZE stale tables, then let PRAGMA optimize do the rest."""
+    stale = stale_statistics(conn)
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    for table in stale:
+        conn.execute(f'ANALYZE "{table}"')
+    conn.execute("PRAGMA optimize")
+    if stale:
+        return f"analyzed {', '.join(stale)}"
+    return "statistics were up to date"
+
+
+def incremental_vacuum(conn: sqlite3.Connection, deadline: float) -> str:
+    """Return free pages to the filesystem a chunk at a time."""
+    if pragma(conn, "auto_vacuum") != 2:
+        return "skipped (auto_vacuum is not incremental; see --enable-incremental-vacuum)"
+    freed = 0
+    while time.monotonic() < deadline:
+        free = pragma(conn, "freelist_count")
+        if free == 0:
+            break
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+        freed += free - pragma(conn, "freelist_count")
+    return f"freed {freed} page(s), {pragma(conn, 'freelist_count')} left"
+
+
+def checkpoint(conn: sqlite3.Connection) -> str:
+    """Copy WAL content back into the database without blocking readers."""
+    if pragma(conn, "journal_mode") != "wal":
+        return "skipped (not in WAL mode)"
+    busy, log_frames, done = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    return f"checkpointed {done} of {log_frames} WAL frame(s)"
+
+
+def maintain(conn: sqlite3.Connection, budget: float = DEFAULT_BUDGET) -> list[tuple[str, str]]:
+    """
+    Run the maintenance steps within a time budget.
+
+    Returns (step, outcome) pairs. A step that runs out of time or cannot
+    get the database lock is reported and skipped, not retried.
+    """
+    deadline = time.monotonic() + budget
+    steps = [(f"merge {table}", lambda t=table: merge_fts(conn, t, deadline))
+             for table in FTS_TABLES]
+    steps += [
+        ("statistics", lambda: update_statistics(conn)),
+        ("incremental vacuum", lambda: incremental_vacuum(conn, deadline)),
+        ("wal checkpoint", lambda: checkpoint(conn)),
+    ]
+
+    results = []
+    for name, step in steps:
+        if time.monotonic() >= deadline:
+            results.append((name, "skipped (out of time)"))
+            continue
+        try:
+            results.append((name, step()))
+        except sqlite3.OperationalError as e:
+            results.append((name, f"skipped ({e})"))
+    return results
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """
+    Switch the database to auto_vacuum=INCREMENTAL.
+
+    Needs a full VACUUM, which locks out readers; run it with the UI stopped.
+    """
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Report on and maintain the library database."
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Path to database file (default: {DEFAULT_DB_PATH})"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help=f"Seconds to spend on maintenance (default: {DEFAULT_BUDGET:.0f})"
+    )
+    parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="Print the health report without changing anything"
+    )
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="One-time switch to auto_vacuum=INCREMENTAL (runs VACUUM; stop the UI first)"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: Database not found at {args.db}")
+        sys.exit(1)
+
+    # Autocommit: each step is its own short transaction
+    conn = sqlite3.connect(args.db, timeout=min(BUSY_TIMEOUT, args.budget),
+                           isolation_level=None)
+    try:
+        if args.enable_incremental_vacuum:
+            enable_incremental_vacuum(conn)
+            print("Enabled incremental vacuum.")
+            return
+
+        print_report(report(conn))
+        if args.report_only:
+            return
+
+        print()
+        start = time.perf_counter()
+        for name, outcome in maintain(conn, args.budget):
+            print(f"{name + ':':<22}{outcome}")
+        print(f"Maintenance took {time.perf_counter() - start:.2f}s")
+
+        stats = report(conn)
+        print("FTS segments now: " + ", ".join(
+            f"{t} {n}" for t, n in stats["fts_segments"].items()
+        ) + f"; free pages: {stats['freelist_count']}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
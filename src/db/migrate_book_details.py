@@ -0,0 +1,188 @@
+"""
+Migrate a database to the split books / book_details layout.
+
+Older databases store the full description, publication date and Open
+Library key inline in books, so every browse and search scan pages in
+description text. This script moves those cold columns into book_details
+(optionally zlib-compressing descriptions), drops the old columns and
+vacuums the file. It also drops the unused excerpt column that earlier
+versions of this migration added.
+
+Usage:
+    python migrate_book_details.py [--db library.db] [--compress] [--benchmark]
+"""
+
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+
+
+DEFAULT_DB_PATH = Path(__file__).parent / "library.db"
+
+BOOK_DETAILS_SQL = """
+CREATE TABLE IF NOT EXISTS book_details (
+    book_id INTEGER PRIMARY KEY,
+    publication_date TEXT,
+    description BLOB,
+    description_compressed INTEGER NOT NULL DEFAULT 0,
+    open_library_key TEXT,
+    FOREIGN KEY (book_id) REFERENCES books(id) ON DELETE CASCADE
+)
+"""
+
+# Only re-index FTS when the title changes, not on every update of a book
+BOOKS_FTS_UPDATE_SQL = """
+CREATE TRIGGER books_fts_update AFTER UPDATE OF title ON books BEGIN
+    INSERT INTO books_fts(books_fts, rowid, title) VALUES('delete', old.id, old.title);
+    INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
+END
+"""
+
+COLD_COLUMNS = ["description", "publication_date", "open_library_key"]
+
+# Columns that earlier versions of the layout kept in books and are no longer used
+UNUSED_COLUMNS = ["excerpt"]
+
+# Full scan of the list columns, valid in both layouts
+BENCHMARK_QUERY = "SELECT id, title, publication_year FROM books"
+
+
+def books_columns(conn: sqlite3.Connection) -> list[str]:
+    """Column names of the books table."""
+    return [row[1] for row in conn.execute("PRAGMA table_info(books)")]
+
+
+def needs_migration(conn: sqlite3.Connection) -> bool:
+    """Check whether books still has the inline description or an unused column."""
+    columns = books_columns(conn)
+    return any(column in columns for column in ["description"] + UNUSED_COLUMNS)
+
+
+def migrate(conn: sqlite3.Connection, compress: bool = False) -> int:
+    """
+    Move cold columns out of books into book_details.
+
+    Returns the number of books migrated (0 if only unused columns were dropped).
+    """
+    columns = books_columns(conn)
+    rows = []
+    conn.execute("BEGIN")
+    try:
+        conn.execute(BOOK_DETAILS_SQL)
+        conn.execute("DROP TRIGGER IF EXISTS books_fts_update")
+        conn.execute(BOOKS_FTS_UPDATE_SQL)
+
+        if "description" in columns:
+            rows = conn.execute(
+                "SELECT id, publication_date, description, open_library_key FROM books"
+            ).fetchall()
+        for book_id, pub_date, description, ol_key in rows:
+            compressed = 0
+            stored = description
+            if compress and description:
+                stored = zlib.compress(description.encode("utf-8"))
+                compressed = 1
+            conn.execute(
+                "INSERT OR REPLACE INTO book_details "
+                "(book_id, publication_date, description, description_compressed, open_library_key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (book_id, pub_date, stored, compressed, ol_key)
+            )
+
+        for column in COLD_COLUMNS + UNUSED_COLUMNS:
+            if column in columns:
+                conn.execute(f"ALTER TABLE books DROP COLUMN {column}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    conn.execute("VACUUM")
+    return len(rows)
+
+
+def benchmark(db_path: Path, iterations: int = 20) -> dict:
+    """Measure database size and average time for a full list scan."""
+    conn = sqlite3.connect(db_path)
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            conn.execute(BENCHMARK_QUERY).fetchall()
+        scan_seconds = (time.perf_counter() - start) / iterations
+        try:
+            books_pages = conn.execute(
+                "SELECT count(*) FROM dbstat WHERE name = 'books'"
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            books_pages = None  # SQLite built without the dbstat table
+    finally:
+        conn.close()
+
+    return {
+        "size_bytes": db_path.stat().st_size,
+        "books_pages": books_pages,
+        "scan_ms": scan_seconds * 1000,
+    }
+
+
+def print_benchmark(label: str, stats: dict) -> None:
+    """Print one line of benchmark results."""
+    print(f"{label:<8} size={stats['size_bytes'] / 1024:.0f} KiB  "
+          f"books pages={stats['books_pages'] or 'n/a'}  scan={stats['scan_ms']:.2f} ms")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Move cold book columns into the book_details table."
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Path to database file (default: {DEFAULT_DB_PATH})"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Store descriptions zlib-compressed"
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Report database size and list scan time before and after"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        if not needs_migration(conn):
+            print("Database already uses the book_details layout.")
+            return
+
+        if args.benchmark:
+            before = benchmark(args.db)
+
+        count = migrate(conn, args.compress)
+        if count:
+            print(f"Migrated {count} books.")
+        else:
+            print("Dropped unused columns from books.")
+    finally:
+        conn.close()
+
+    if args.benchmark:
+        print_benchmark("Before:", before)
+        print_benchmark("After:", benchmark(args.db))
+
+
+if __name__ == "__main__":
+    main()
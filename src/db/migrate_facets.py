@@ -0,0 +1,80 @@
+"""
+Add the facet count tables to an existing database.
+
+Creates the tables and triggers from facets.sql (if missing) and rebuilds
+the counts from the current books, authors and publishers. Safe to re-run;
+use it to repair counts if they ever drift.
+
+Usage:
+    python migrate_facets.py [--db library.db]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+
+DEFAULT_DB_PATH = Path(__file__).parent / "library.db"
+FACETS_PATH = Path(__file__).parent / "facets.sql"
+
+REBUILD_SQL = """
+DELETE FROM year_counts;
+INSERT INTO year_counts (year, count)
+    SELECT publication_year, COUNT(*) FROM books
+    WHERE publication_year IS NOT NULL
+    GROUP BY publication_year;
+
+DELETE FROM decade_counts;
+INSERT INTO decade_counts (decade, count)
+    SELECT publication_year / 10 * 10, COUNT(*) FROM books
+    WHERE publication_year IS NOT NULL
+    GROUP BY publication_year / 10 * 10;
+
+DELETE FROM author_counts;
+INSERT INTO author_counts (author_id, count)
+    SELECT author_id, COUNT(*) FROM book_authors GROUP BY author_id;
+
+DELETE FROM publisher_counts;
+INSERT INTO publisher_counts (publisher_id, count)
+    SELECT publisher_id, COUNT(*) FROM book_publishers GROUP BY publisher_id;
+"""
+
+
+def rebuild_facets(conn: sqlite3.Connection) -> None:
+    """Create the facet tables and triggers if needed and recompute all counts."""
+    with open(FACETS_PATH, "r") as f:
+        facets_sql = f.read()
+    conn.executescript(facets_sql)
+    conn.executescript(f"BEGIN;\n{REBUILD_SQL}\nCOMMIT;")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Add or rebuild the facet count tables."
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Path to database file (default: {DEFAULT_DB_PATH})"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        rebuild_facets(conn)
+    finally:
+        conn.close()
+
+    print("Facet counts rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
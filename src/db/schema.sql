@@ -8,17 +8,26 @@ PRAGMA foreign_keys = ON;
 -- =============================================================================
 
 -- Books: The central entity
+-- Only the narrow, frequently scanned columns live here; see book_details
 CREATE TABLE books (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     isbn TEXT UNIQUE NOT NULL,
     title TEXT NOT NULL,
-    publication_date TEXT,           -- Original date string from source
     publication_year INTEGER,        -- Extracted year for filtering/sorting
-    description TEXT,
-    open_library_key TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Book details: cold metadata, only read when showing a single book.
+-- Kept out of books so browse and search scans don't page in descriptions.
+CREATE TABLE book_details (
+    book_id INTEGER PRIMARY KEY,
+    publication_date TEXT,           -- Original date string from source
+    description BLOB,                -- Text, or zlib-compressed UTF-8 if description_compressed = 1
+    description_compressed INTEGER NOT NULL DEFAULT 0,
+    open_library_key TEXT,
+    FOREIGN KEY (book_id) REFERENCES books(id) ON DELETE CASCADE
+);
+
 -- Authors
 CREATE TABLE authors (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -117,7 +126,7 @@ CREATE TRIGGER books_fts_delete AFTER DELETE ON books BEGIN
     INSERT INTO books_fts(books_fts, rowid, title) VALUES('delete', old.id, old.title);
 END;
 
-CREATE TRIGGER books_fts_update AFTER UPDATE ON books BEGIN
+CREATE TRIGGER books_fts_update AFTER UPDATE OF title ON books BEGIN
     INSERT INTO books_fts(books_fts, rowid, title) VALUES('delete', old.id, old.title);
     INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
 END;
@@ -9,16 +9,30 @@ This script:
 """
 
 import json
+import os
+import sys
 import time
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from ingest_metrics import IngestMetrics
+from rate_control import (
+    MAX_RATE,
+    MAX_RETRIES,
+    THROTTLE_STATUSES,
+    CircuitOpenError,
+    RateController,
+    parse_retry_after,
+)
 
-# Rate limiting: wait this many seconds between requests
-RATE_LIMIT_SECONDS = 1
 
-OPEN_LIBRARY_API = "https://openlibrary.org"
+# Can be pointed at a local stub server for testing
+OPEN_LIBRARY_API = os.environ.get("OPEN_LIBRARY_API", "https://openlibrary.org")
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (5, 30)
 
 
 def read_isbns(filepath: str) -> list[str]:
@@ -34,40 +48,105 @@ def read_isbns(filepath: str) -> list[str]:
     return isbns
 
 
-def fetch_edition_data(session: requests.Session, isbn: str) -> dict | None:
-    """Fetch edition data for an ISBN from Open Library."""
-    url = f"{OPEN_LIBRARY_API}/isbn/{isbn}.json"
-    response = session.get(url)
+def make_session() -> requests.Session:
+    """Create the HTTP session used for all Open Library requests."""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "LibraryIngestion/1.0 (Personal Library Project)"
+    })
+    # Requests are sequential to a single host: one pooled keep-alive
+    # connection is enough. Retries are handled by get_json, not urllib3.
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-    if response.status_code == 404:
-        return None
-    response.raise_for_status()
 
-    return response.json()
+def get_json(session: requests.Session, url: str, stage: str,
+             metrics: IngestMetrics | None = None,
+             rate: RateController | None = None) -> dict | None:
+    """
+    GET a JSON document from Open Library.
 
+    Returns None on 404. With a rate controller, requests are paced and
+    throttled (429/503), 5xx and connection errors are retried with
+    backoff. Records timing, status and payload size of every attempt
+    when metrics are being collected.
+    """
+    attempt = 0
+    while True:
+        if rate:
+            slept = rate.wait()
+            if metrics:
+                metrics.record_sleep(slept)
+
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if metrics:
+                metrics.record_request(stage, time.perf_counter() - start, None, 0,
+                                       retries=1 if attempt else 0)
+            if rate is None or attempt >= MAX_RETRIES:
+                raise
+            rate.on_server_error(attempt)
+            attempt += 1
+            continue
+        elapsed = time.perf_counter() - start
+
+        data = None
+        parse_seconds = 0.0
+        if response.ok:
+            parse_start = time.perf_counter()
+            data = response.json()
+            parse_seconds = time.perf_counter() - parse_start
+
+        if metrics:
+            metrics.record_request(stage, elapsed, response.status_code,
+                                   len(response.content), parse_seconds=parse_seconds,
+                                   retries=1 if attempt else 0)
+
+        status = response.status_code
+        if rate and (status in THROTTLE_STATUSES or status >= 500) and attempt < MAX_RETRIES:
+            if status in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                rate.on_throttle(retry_after, attempt)
+            else:
+                rate.on_server_error(attempt)
+            attempt += 1
+            continue
+        if rate and (response.ok or status == 404):
+            rate.on_success()
 
-def fetch_work_data(session: requests.Session, work_key: str) -> dict | None:
-    """Fetch work data from Open Library."""
-    url = f"{OPEN_LIBRARY_API}{work_key}.json"
-    response = session.get(url)
+        if status == 404:
+            return None
+        response.raise_for_status()
 
-    if response.status_code == 404:
-        return None
-    response.raise_for_status()
+        return data
 
-    return response.json()
 
+def fetch_edition_data(session: requests.Session, isbn: str,
+                       metrics: IngestMetrics | None = None,
+                       rate: RateController | None = None) -> dict | None:
+    """Fetch edition data for an ISBN from Open Library."""
+    url = f"{OPEN_LIBRARY_API}/isbn/{isbn}.json"
+    return get_json(session, url, "edition", metrics, rate)
 
-def fetch_author_data(session: requests.Session, author_key: str) -> dict | None:
-    """Fetch author data from Open Library."""
-    url = f"{OPEN_LIBRARY_API}{author_key}.json"
-    response = session.get(url)
 
-    if response.status_code == 404:
-        return None
-    response.raise_for_status()
+def fetch_work_data(session: requests.Session, work_key: str,
+                    metrics: IngestMetrics | None = None,
+                    rate: RateController | None = None) -> dict | None:
+    """Fetch work data from Open Library."""
+    url = f"{OPEN_LIBRARY_API}{work_key}.json"
+    return get_json(session, url, "work", metrics, rate)
+
 
-    return response.json()
+def fetch_author_data(session: requests.Session, author_key: str,
+                      metrics: IngestMetrics | None = None,
+                      rate: RateController | None = None) -> dict | None:
+    """Fetch author data from Open Library."""
+    url = f"{OPEN_LIBRARY_API}{author_key}.json"
+    return get_json(session, url, "author", metrics, rate)
 
 
 def extract_description(work_data: dict) -> str:
@@ -90,7 +169,54 @@ def extract_first_sentence(data: dict) -> str:
     return str(first_sentence)
 
 
-def fetch_book_by_isbn(session: requests.Session, isbn: str) -> dict | None:
+def extract_work_key(edition: dict) -> str | None:
+    """Return the key of the first work an edition belongs to."""
+    works = edition.get("works", [])
+    if works:
+        return works[0].get("key")
+    return None
+
+
+def extract_author_keys(edition: dict, work_data: dict) -> list[str]:
+    """
+    Return author keys for a book, preferring the edition's authors.
+
+    Edition authors format: [{'key': '/authors/...'}]
+    Work authors format: [{'author': {'key': '/authors/...'}}]
+    """
+    author_keys = []
+    author_refs = edition.get("authors", []) or work_data.get("authors", [])
+    for author_ref in author_refs:
+        if not isinstance(author_ref, dict):
+            continue
+        # Handle work-level format (nested under 'author' key)
+        if "author" in author_ref:
+            author_key = author_ref["author"].get("key")
+        else:
+            # Handle edition-level format (direct 'key')
+            author_key = author_ref.get("key")
+        if author_key:
+            author_keys.append(author_key)
+    return author_keys
+
+
+def build_book_data(isbn: str, edition: dict, work_data: dict, authors: list[str]) -> dict:
+    """Build the book_data record written to output.json."""
+    return {
+        "isbn": isbn,
+        "title": edition.get("title", ""),
+        "authors": authors,
+        "publication_date": edition.get("publish_date", ""),
+        "publishers": [p.get("name", p) if isinstance(p, dict) else p
+                       for p in edition.get("publishers", [])],
+        "description": extract_description(work_data),
+        "open_library_key": edition.get("key"),
+    }
+
+
+def fetch_book_by_isbn(session: requests.Session, isbn: str,
+                       metrics: IngestMetrics | None = None,
+                       rate: RateController | None = None) -> dict | None:
     """
     Fetch book data for a given ISBN from Open Library.
 
@@ -99,7 +225,7 @@ def fetch_book_by_isbn(session: requests.Session, isbn: str) -> dict | None:
     print(f"Fetching data for ISBN: {isbn}")
 
     # Get edition data
-    edition = fetch_edition_data(session, isbn)
+    edition = fetch_edition_data(session, isbn, metrics, rate)
     if not edition:
         print(f"  Not found in Open Library")
         return None
@@ -109,82 +235,105 @@ def fetch_book_by_isbn(session: requests.Session, isbn: str) -> dict | None:
 
     # Get work data for more metadata
     work_data = {}
-    works = edition.get("works", [])
-    if works:
-        work_key = works[0].get("key")
-        if work_key:
-            time.sleep(RATE_LIMIT_SECONDS)
-            work_data = fetch_work_data(session, work_key) or {}
+    work_key = extract_work_key(edition)
+    if work_key:
+        work_data = fetch_work_data(session, work_key, metrics, rate) or {}
 
     # Get author names
-    # Edition authors format: [{'key': '/authors/...'}]
-    # Work authors format: [{'author': {'key': '/authors/...'}}]
     authors = []
-    author_keys = edition.get("authors", []) or work_data.get("authors", [])
-    for author_ref in author_keys:
-        if not isinstance(author_ref, dict):
-            continue
-        # Handle work-level format (nested under 'author' key)
-        if "author" in author_ref:
-            author_key = author_ref["author"].get("key")
-        else:
-            # Handle edition-level format (direct 'key')
-            author_key = author_ref.get("key")
-        if author_key:
-            time.sleep(RATE_LIMIT_SECONDS)
-            author_data = fetch_author_data(session, author_key)
-            if author_data:
-                name = author_data.get("name", "")
-                if name:
-                    authors.append(name)
+    for author_key in extract_author_keys(edition, work_data):
+        author_data = fetch_author_data(session, author_key, metrics, rate)
+        if author_data:
+            name = author_data.get("name", "")
+            if name:
+                authors.append(name)
 
     print(f"  Author(s): {', '.join(authors)}")
 
-    # Build the book data
-    book_data = {
-        "isbn": isbn,
-        "title": title,
-        "authors": authors,
-        "publication_date": edition.get("publish_date", ""),
-        "publishers": [p.get("name", p) if isinstance(p, dict) else p
-                       for p in edition.get("publishers", [])],
-        "description": extract_description(work_data),
-        "open_library_key": edition.get("key"),
-    }
+    book_data = build_book_data(isbn, edition, work_data, authors)
 
     return book_data
 
 
 def main():
     """Main entry point for the ingestion script."""
-    isbn_file = Path(__file__).parent / "data" / "isbn.txt"
-    output_file = Path(__file__).parent / "data" / "output.json"
-
-    isbns = read_isbns(isbn_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Fetch book data from Open Library for each ISBN."
+    )
+    parser.add_argument(
+        "--isbns",
+        type=Path,
+        default=Path(__file__).parent / "data" / "isbn.txt",
+        help="File of ISBNs to fetch, one per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent / "data" / "output.json",
+        help="Where to write the book data JSON"
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Write per-ISBN metrics and the run summary to this JSON file"
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=MAX_RATE,
+        help=f"Maximum requests per second (default: {MAX_RATE})"
+    )
+    args = parser.parse_args()
+
+    if not args.isbns.exists():
+        print(f"Error: ISBN file not found at {args.isbns}")
+        sys.exit(1)
+    output_file = args.output
+
+    isbns = read_isbns(args.isbns)
     print(f"Found {len(isbns)} ISBNs to process")
     print()
 
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "LibraryIngestion/1.0 (Personal Library Project)"
-    })
+    session = make_session()
+    rate = RateController(max_rate=args.max_rate)
 
+    metrics = IngestMetrics()
     results = []
     for isbn in isbns:
+        metrics.start_isbn(isbn)
+        outcome = "not_found"
         try:
-            book_data = fetch_book_by_isbn(session, isbn)
+            book_data = fetch_book_by_isbn(session, isbn, metrics, rate)
             if book_data:
                 results.append(book_data)
+                outcome = "found"
+        except CircuitOpenError as e:
+            # Keep what we have rather than failing every remaining ISBN
+            print(f"  Error: {e}")
+            metrics.finish_isbn("error")
+            break
         except Exception as e:
             print(f"  Error: {e}")
+            outcome = "error"
         print()
-        time.sleep(RATE_LIMIT_SECONDS)
+        metrics.finish_isbn(outcome)
+    metrics.finish()
+    print(f"Final request rate: {rate.rate:.2f}/s")
 
     # Write results to JSON
     with open(output_file, "w") as f:
         json.dump(results, f, indent=2)
 
     print(f"Wrote {len(results)} books to {output_file}")
+    print()
+    print(metrics.report())
+
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+        print(f"Wrote metrics to {args.metrics_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,356 @@
+"""
+Offline ingestion from Open Library bulk data dumps.
+
+For large collections, resolving ISBNs through the rate-limited API is too
+slow. This script streams the gzip-compressed editions, works and authors
+dumps (https://openlibrary.org/developers/dumps) line by line, builds an
+ISBN-to-edition index and a key-to-record index in a scratch SQLite
+database, then resolves isbn.txt against them with no network traffic.
+
+Dump lines are tab-separated: type, key, revision, last_modified, JSON.
+
+Usage:
+    python ingest_dumps.py --editions ol_dump_editions.txt.gz \\
+        --works ol_dump_works.txt.gz --authors ol_dump_authors.txt.gz
+
+The output is the same list of book_data records that ingest.py writes.
+ISBNs are matched in normalized ISBN-13 form, so an ISBN-10 in isbn.txt
+finds an edition that only lists its ISBN-13 and vice versa, as the API
+does.
+
+By default only the editions for isbn.txt are indexed. The index records
+which ISBNs it was built for, and refuses to be reused for ISBNs it does
+not cover; rebuild it from the dumps, or build it once with --all.
+"""
+
+import gzip
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from ingest import (
+    build_book_data,
+    extract_author_keys,
+    extract_work_key,
+    read_isbns,
+)
+from search import normalize_isbn
+
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / "data" / "dump_index.db"
+
+# Rows buffered before each executemany, keeps memory use constant
+BATCH_SIZE = 10000
+
+# Bumped when the index layout or ISBN keys change
+INDEX_VERSION = 2
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS isbn_index (
+    isbn TEXT PRIMARY KEY,          -- normalize_isbn() form
+    edition_key TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- version, and mode: 'all' or 'filtered'
+CREATE TABLE IF NOT EXISTS index_info (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- ISBNs a filtered index was built for
+CREATE TABLE IF NOT EXISTS indexed_isbns (
+    isbn TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+def open_index(index_path: Path) -> sqlite3.Connection:
+    """Open (or create) the scratch index database."""
+    conn = sqlite3.connect(index_path)
+    # Scratch data: rebuildable from the dumps, so skip durability
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+
+def read_dump(dump_path: Path):
+    """Yield (key, json_text) pairs from a gzip-compressed dump file."""
+    opener = gzip.open if str(dump_path).endswith(".gz") else open
+    with opener(dump_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t", 4)
+            if len(parts) != 5:
+                continue
+            yield parts[1], parts[4]
+
+
+def index_editions(conn: sqlite3.Connection, dump_path: Path,
+                   isbns: set[str] | None = None) -> tuple[set[str], set[str]]:
+    """
+    Index editions from the editions dump.
+
+    Only editions matching one of `isbns` (normalized ISBNs) are kept,
+    unless `isbns` is None. Returns the work keys and author keys
+    referenced by the kept editions.
+    """
+    work_keys = set()
+    author_keys = set()
+    isbn_rows = []
+    record_rows = []
+
+    for key, data in read_dump(dump_path):
+        # Cheap pre-check before paying for the JSON parse
+        if '"isbn_' not in data:
+            continue
+        edition = json.loads(data)
+        edition_isbns = edition.get("isbn_13", []) + edition.get("isbn_10", [])
+        edition_isbns = {normalize_isbn(i) for i in edition_isbns} - {""}
+        if isbns is not None:
+            edition_isbns = [i for i in edition_isbns if i in isbns]
+        if not edition_isbns:
+            continue
+
+        isbn_rows.extend((isbn, key) for isbn in edition_isbns)
+        record_rows.append((key, data))
+        if isbns is not None:
+            work_key = extract_work_key(edition)
+            if work_key:
+                work_keys.add(work_key)
+            author_keys.update(extract_author_keys(edition, {}))
+
+        if len(record_rows) >= BATCH_SIZE:
+            flush_rows(conn, isbn_rows, record_rows)
+
+    flush_rows(conn, isbn_rows, record_rows)
+    return work_keys, author_keys
+
+
+def index_records(conn: sqlite3.Connection, dump_path: Path,
+                  keys: set[str] | None = None) -> set[str]:
+    """
+    Index works or authors from a dump into the key-to-record table.
+
+    Only records whose key is in `keys` are kept, unless `keys` is None.
+    Returns the author keys referenced by the kept records (for works).
+    """
+    author_keys = set()
+    record_rows = []
+
+    for key, data in read_dump(dump_path):
+        if keys is not None and key not in keys:
+            continue
+        record_rows.append((key, data))
+        if keys is not None and key.startswith("/works/"):
+            author_keys.update(extract_author_keys({}, json.loads(data)))
+
+        if len(record_rows) >= BATCH_SIZE:
+            flush_rows(conn, [], record_rows)
+
+    flush_rows(conn, [], record_rows)
+    return author_keys
+
+
+def flush_rows(conn: sqlite3.Connection, isbn_rows: list, record_rows: list) -> None:
+    """Write buffered rows to the index and clear the buffers."""
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO isbn_index (isbn, edition_key) VALUES (?, ?)",
+            isbn_rows
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (key, data) VALUES (?, ?)",
+            record_rows
+        )
+    isbn_rows.clear()
+    record_rows.clear()
+
+
+def build_index(conn: sqlite3.Connection, editions_path: Path, works_path: Path,
+                authors_path: Path, isbns: set[str] | None = None) -> None:
+    """
+    Build the scratch index from the three dump files.
+
+    When `isbns` is given, only the editions for those ISBNs and the works
+    and authors they reference are stored, keeping the index small.
+    """
+    if isbns is not None:
+        isbns = {normalize_isbn(i) for i in isbns}
+    record_filter(conn, isbns)
+
+    print(f"Indexing editions from {editions_path}")
+    work_keys, author_keys = index_editions(conn, editions_path, isbns)
+
+    print(f"Indexing works from {works_path}")
+    work_author_keys = index_records(conn, works_path, work_keys if isbns is not None else None)
+
+    print(f"Indexing authors from {authors_path}")
+    if isbns is not None:
+        index_records(conn, authors_path, author_keys | work_author_keys)
+    else:
+        index_records(conn, authors_path)
+
+
+def record_filter(conn: sqlite3.Connection, isbns: set[str] | None) -> None:
+    """Record which ISBNs the index covers (all, or the given set)."""
+    with conn:
+        version = conn.execute("SELECT value FROM index_info WHERE name = 'version'").fetchone()
+        if version is None or version[0] != str(INDEX_VERSION):
+            # Older indexes used different ISBN keys: start over
+            for table in ("isbn_index", "records", "index_info", "indexed_isbns"):
+                conn.execute(f"DELETE FROM {table}")
+        conn.execute("INSERT OR REPLACE INTO index_info (name, value) VALUES ('version', ?)",
+                     (str(INDEX_VERSION),))
+        mode = conn.execute("SELECT value FROM index_info WHERE name = 'mode'").fetchone()
+        if isbns is None or (mode and mode[0] == "all"):
+            conn.execute("INSERT OR REPLACE INTO index_info (name, value) VALUES ('mode', 'all')")
+        else:
+            # Rebuilding into an existing index adds to what it covers
+            conn.execute("INSERT OR REPLACE INTO index_info (name, value) VALUES ('mode', 'filtered')")
+            conn.executemany("INSERT OR IGNORE INTO indexed_isbns (isbn) VALUES (?)",
+                             ((i,) for i in isbns))
+
+
+def uncovered_isbns(conn: sqlite3.Connection, isbns: list[str]) -> list[str]:
+    """
+    Return the ISBNs an existing index was not built for.
+
+    Raises ValueError if the index predates the current layout.
+    """
+    info = dict(conn.execute("SELECT name, value FROM index_info").fetchall())
+    if info.get("version") != str(INDEX_VERSION):
+        raise ValueError("index was built by an older version of this script")
+    if info.get("mode") == "all":
+        return []
+    return [isbn for isbn in isbns if not conn.execute(
+        "SELECT 1 FROM indexed_isbns WHERE isbn = ?", (normalize_isbn(isbn),)
+    ).fetchone()]
+
+
+def get_record(conn: sqlite3.Connection, key: str) -> dict | None:
+    """Look up a work or author record by key."""
+    row = conn.execute("SELECT data FROM records WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def resolve_isbn(conn: sqlite3.Connection, isbn: str) -> dict | None:
+    """
+    Resolve an ISBN against the index.
+
+    Returns the same book_data dict as ingest.fetch_book_by_isbn, or None.
+    """
+    row = conn.execute(
+        "SELECT edition_key FROM isbn_index WHERE isbn = ?", (normalize_isbn(isbn),)
+    ).fetchone()
+    if not row:
+        return None
+    edition = get_record(conn, row[0])
+    if not edition:
+        return None
+
+    work_data = {}
+    work_key = extract_work_key(edition)
+    if work_key:
+        work_data = get_record(conn, work_key) or {}
+
+    authors = []
+    for author_key in extract_author_keys(edition, work_data):
+        author_data = get_record(conn, author_key)
+        if author_data:
+            name = author_data.get("name", "")
+            if name:
+                authors.append(name)
+
+    return build_book_data(isbn, edition, work_data, authors)
+
+
+def main():
+    """Main entry point for offline ingestion."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Resolve ISBNs against Open Library bulk data dumps."
+    )
+    parser.add_argument("--editions", type=Path, help="Editions dump (.txt.gz)")
+    parser.add_argument("--works", type=Path, help="Works dump (.txt.gz)")
+    parser.add_argument("--authors", type=Path, help="Authors dump (.txt.gz)")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=DEFAULT_INDEX_PATH,
+        help=f"Scratch index database (default: {DEFAULT_INDEX_PATH})"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Index every edition in the dump, not just those in the ISBN file"
+    )
+    parser.add_argument(
+        "--isbns",
+        type=Path,
+        default=Path(__file__).parent / "data" / "isbn.txt",
+        help="File of ISBNs to resolve, one per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent / "data" / "output.json",
+        help="Where to write the book data JSON"
+    )
+    args = parser.parse_args()
+
+    isbns = read_isbns(args.isbns)
+    print(f"Found {len(isbns)} ISBNs to process")
+
+    index_exists = args.index.exists()
+    conn = open_index(args.index)
+    try:
+        dumps = [args.editions, args.works, args.authors]
+        if any(dumps):
+            if not all(dumps):
+                print("Error: --editions, --works and --authors must be given together",
+                      file=sys.stderr)
+                sys.exit(1)
+            build_index(conn, args.editions, args.works, args.authors,
+                        None if args.all else set(isbns))
+        elif not index_exists:
+            print(f"Error: no index at {args.index}; pass the dump files to build one",
+                  file=sys.stderr)
+            sys.exit(1)
+        else:
+            try:
+                missing = uncovered_isbns(conn, isbns)
+            except ValueError as e:
+                print(f"Error: {e}; pass the dump files to rebuild {args.index}",
+                      file=sys.stderr)
+                sys.exit(1)
+            if missing:
+                print(f"Error: the index at {args.index} was built for a different ISBN list "
+                      f"and does not cover {len(missing)} ISBN(s), e.g. {missing[0]}; "
+                      f"pass the dump files to add them", file=sys.stderr)
+                sys.exit(1)
+
+        results = []
+        for isbn in isbns:
+            book_data = resolve_isbn(conn, isbn)
+            if book_data:
+                results.append(book_data)
+            else:
+                print(f"  Not found in dumps: {isbn}")
+    finally:
+        conn.close()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Wrote {len(results)} books to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Metrics collection for the ingestion pipeline.
+
+Records per-ISBN timings (edition, work and author fetches, JSON parsing,
+rate limit sleeps), HTTP status codes, retries and payload bytes, then
+aggregates them into latency histograms and a throughput report.
+"""
+
+import json
+import time
+from pathlib import Path
+
+
+# Upper bounds (in seconds) of the latency histogram buckets
+HISTOGRAM_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+STAGES = ["edition", "work", "author"]
+
+
+def histogram(values: list[float]) -> dict[str, int]:
+    """Count values into the fixed latency buckets."""
+    counts = {f"<={bound}s": 0 for bound in HISTOGRAM_BUCKETS}
+    counts[f">{HISTOGRAM_BUCKETS[-1]}s"] = 0
+    for value in values:
+        for bound in HISTOGRAM_BUCKETS:
+            if value <= bound:
+                counts[f"<={bound}s"] += 1
+                break
+        else:
+            counts[f">{HISTOGRAM_BUCKETS[-1]}s"] += 1
+    return counts
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the given percentile (0-100) of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class IngestMetrics:
+    """Collects metrics for one ingestion run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.records = []
+        self.current = None
+
+    def start_isbn(self, isbn: str) -> None:
+        """Begin collecting metrics for an ISBN."""
+        self.current = {
+            "isbn": isbn,
+            "outcome": None,
+            "total_seconds": 0.0,
+            "sleep_seconds": 0.0,
+            "parse_seconds": 0.0,
+            "requests": [],
+            "_started": time.perf_counter(),
+        }
+
+    def record_request(self, stage: str, seconds: float, status: int | None,
+                       nbytes: int, parse_seconds: float = 0.0,
+                       retries: int = 0) -> None:
+        """Record one HTTP request made while processing the current ISBN."""
+        if self.current is None:
+            return
+        self.current["requests"].append({
+            "stage": stage,
+            "seconds": seconds,
+            "status": status,
+            "bytes": nbytes,
+            "retries": retries,
+        })
+        self.current["parse_seconds"] += parse_seconds
+
+    def record_sleep(self, seconds: float) -> None:
+        """Record time spent sleeping for the rate limit."""
+        if self.current is None:
+            return
+        self.current["sleep_seconds"] += seconds
+
+    def finish_isbn(self, outcome: str) -> None:
+        """Finish the current ISBN with an outcome ('found', 'not_found', 'error')."""
+        if self.current is None:
+            return
+        record = self.current
+        record["outcome"] = outcome
+        record["total_seconds"] = time.perf_counter() - record.pop("_started")
+        self.records.append(record)
+        self.current = None
+
+    def finish(self) -> None:
+        """Mark the run as finished."""
+        self.finished = time.perf_counter()
+
+    def summary(self) -> dict:
+        """Aggregate per-ISBN records into run-level statistics."""
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        requests = [r for record in self.records for r in record["requests"]]
+
+        stages = {}
+        for stage in STAGES:
+            latencies = [r["seconds"] for r in requests if r["stage"] == stage]
+            stages[stage] = {
+                "count": len(latencies),
+                "total_seconds": sum(latencies),
+                "p50_seconds": percentile(latencies, 50),
+                "p95_seconds": percentile(latencies, 95),
+                "max_seconds": max(latencies, default=0.0),
+                "histogram": histogram(latencies),
+            }
+
+        status_codes = {}
+        for r in requests:
+            key = str(r["status"])
+            status_codes[key] = status_codes.get(key, 0) + 1
+
+        outcomes = {}
+        for record in self.records:
+            outcomes[record["outcome"]] = outcomes.get(record["outcome"], 0) + 1
+
+        network_seconds = sum(r["seconds"] for r in requests)
+        sleep_seconds = sum(record["sleep_seconds"] for record in self.records)
+        parse_seconds = sum(record["parse_seconds"] for record in self.records)
+
+        return {
+            "isbns": len(self.records),
+            "outcomes": outcomes,
+            "elapsed_seconds": elapsed,
+            "isbns_per_minute": len(self.records) / elapsed * 60 if elapsed else 0.0,
+            "requests": len(requests),
+            "retries": sum(r["retries"] for r in requests),
+            "bytes": sum(r["bytes"] for r in requests),
+            "network_seconds": network_seconds,
+            "sleep_seconds": sleep_seconds,
+            "parse_seconds": parse_seconds,
+            "other_seconds": max(0.0, elapsed - network_seconds - sleep_seconds - parse_seconds),
+            "status_codes": status_codes,
+            "stages": stages,
+            "isbn_latency_histogram": histogram([r["total_seconds"] for r in self.records]),
+        }
+
+    def report(self) -> str:
+        """Format the summary as a human-readable throughput report."""
+        s = self.summary()
+        elapsed = s["elapsed_seconds"] or 1.0
+
+        lines = []
+        lines.append("=" * 60)
+        lines.append("Ingestion metrics")
+        lines.append("=" * 60)
+        lines.append(f"ISBNs:       {s['isbns']} "
+                     f"({', '.join(f'{k}: {v}' for k, v in sorted(s['outcomes'].items()))})")
+        lines.append(f"Elapsed:     {s['elapsed_seconds']:.1f}s "
+                     f"({s['isbns_per_minute']:.1f} ISBNs/min)")
+        lines.append(f"Requests:    {s['requests']} "
+                     f"({s['retries']} retries, {s['bytes'] / 1024:.1f} KiB)")
+        lines.append(f"Status:      "
+                     f"{', '.join(f'{k}: {v}' for k, v in sorted(s['status_codes'].items()))}")
+        lines.append("")
+        lines.append("Time breakdown:")
+        for label, key in [("Network", "network_seconds"), ("Rate limit", "sleep_seconds"),
+                           ("Parsing", "parse_seconds"), ("Other", "other_seconds")]:
+            lines.append(f"  {label:<11}{s[key]:8.1f}s  {s[key] / elapsed * 100:5.1f}%")
+        lines.append("")
+        lines.append("Request latency by stage:")
+        for stage, stats in s["stages"].items():
+            lines.append(f"  {stage:<8} n={stats['count']:<5} "
+                         f"p50={stats['p50_seconds']:.3f}s "
+                         f"p95={stats['p95_seconds']:.3f}s "
+                         f"max={stats['max_seconds']:.3f}s")
+            buckets = "  ".join(f"{k}:{v}" for k, v in stats["histogram"].items() if v)
+            if buckets:
+                lines.append(f"           {buckets}")
+
+        return "\n".join(lines)
+
+    def write_json(self, path: Path) -> None:
+        """Export the summary and per-ISBN records to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "records": self.records}, f, indent=2)
@@ -0,0 +1,126 @@
+"""
+Adaptive rate control for the Open Library client.
+
+Replaces a fixed sleep between requests with:
+- AIMD pacing: the request rate grows additively after each success and
+  is halved whenever the server throttles us (429/503)
+- Retry-After: a throttled response pauses all requests for as long as
+  the server asks
+- Jittered exponential backoff between retries of a failed request
+- A circuit breaker that pauses the run after sustained throttling or
+  5xx errors and gives up if the server keeps failing
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# Requests per second
+INITIAL_RATE = 1.0
+MIN_RATE = 0.1
+MAX_RATE = 3.0
+ADDITIVE_INCREASE = 0.1
+MULTIPLICATIVE_DECREASE = 0.5
+
+# Retry backoff (seconds): random in [0, min(cap, base * 2**attempt)]
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+MAX_RETRIES = 5
+
+# Circuit breaker: open after this many consecutive throttled or failed requests
+FAILURE_THRESHOLD = 5
+COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 600.0
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class CircuitOpenError(Exception):
+    """Raised when the server keeps failing after repeated cooldowns."""
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateController:
+    """Paces requests and reacts to throttling and server errors."""
+
+    def __init__(self, initial_rate: float = INITIAL_RATE, min_rate: float = MIN_RATE,
+                 max_rate: float = MAX_RATE):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.next_allowed = 0.0
+        self.consecutive_failures = 0
+        self.cooldown = COOLDOWN_SECONDS
+
+    def wait(self) -> float:
+        """Sleep until the next request may be sent. Returns seconds slept."""
+        now = time.monotonic()
+        delay = max(0.0, self.next_allowed - now)
+        if delay:
+            time.sleep(delay)
+        self.next_allowed = max(now, self.next_allowed) + 1.0 / self.rate
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for at least the given time."""
+        self.next_allowed = max(self.next_allowed, time.monotonic() + seconds)
+
+    def on_success(self) -> None:
+        """Additive increase after a successful request."""
+        self.rate = min(self.max_rate, self.rate + ADDITIVE_INCREASE)
+        self.consecutive_failures = 0
+        self.cooldown = COOLDOWN_SECONDS
+
+    def on_throttle(self, retry_after: float | None, attempt: int) -> None:
+        """
+        Multiplicative decrease, then wait as long as the server asked.
+
+        Counts toward the circuit breaker, so a sustained 503 outage pauses
+        the run the same way as other server errors.
+        """
+        self.rate = max(self.min_rate, self.rate * MULTIPLICATIVE_DECREASE)
+        self.pause(max(retry_after or 0.0, backoff(attempt)))
+        self.record_failure()
+
+    def on_server_error(self, attempt: int) -> None:
+        """Back off after a 5xx or connection error, opening the circuit if sustained."""
+        self.pause(backoff(attempt))
+        self.record_failure()
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit once failures are sustained."""
+        self.consecutive_failures += 1
+        if self.consecutive_failures < FAILURE_THRESHOLD:
+            return
+
+        # Circuit open: pause everything, then let one request probe the server
+        if self.cooldown > MAX_COOLDOWN_SECONDS:
+            raise CircuitOpenError(
+                f"{self.consecutive_failures} consecutive failed requests, giving up"
+            )
+        print(f"  Server failing, pausing requests for {self.cooldown:.0f}s")
+        self.pause(self.cooldown)
+        self.cooldown *= 2
+        self.consecutive_failures = FAILURE_THRESHOLD - 1
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
@@ -3,9 +3,18 @@ Library search module.
 
 Provides search functionality against the library database.
 Uses FTS5 for fuzzy text matching on titles and authors.
+
+List queries return only id, title, authors and year; the description,
+publishers and ISBN of a single book are loaded on demand with
+get_book_details(). batch_lookup() resolves many ISBNs or terms in one
+query, for shelf audits.
 """
 
+import mmap
+import os
+import re
 import sqlite3
+import zlib
 from pathlib import Path
 
 
@@ -21,6 +30,42 @@ def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
     return conn
 
 
+def warm_cache(db_path: Path | None = None) -> int:
+    """
+    Pull the database file into the OS page cache.
+
+    Memory-maps the file and touches one byte per page so that the FTS and
+    index pages are resident before the first query, then runs a cheap
+    query against each FTS table so SQLite has parsed the schema once.
+    Returns the number of bytes pre-read.
+    """
+    if db_path is None:
+        db_path = DEFAULT_DB_PATH
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return 0
+
+    size = db_path.stat().st_size
+    if size == 0:
+        return 0
+
+    with open(db_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, size, mmap.PAGESIZE):
+                mm[offset]
+
+    conn = get_connection(db_path)
+    try:
+        conn.execute("SELECT rowid FROM books_fts WHERE books_fts MATCH 'a*' LIMIT 1").fetchall()
+        conn.execute("SELECT rowid FROM authors_fts WHERE authors_fts MATCH 'a*' LIMIT 1").fetchall()
+    finally:
+        conn.close()
+
+    return size
+
+
 def search_by_title(conn: sqlite3.Connection, term: str) -> list[sqlite3.Row]:
     """
     Search books by title using FTS5 fuzzy matching.
@@ -32,7 +77,6 @@ def search_by_title(conn: sqlite3.Connection, term: str) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors
         FROM books_fts fts
         JOIN books b ON b.id = fts.rowid
@@ -58,7 +102,6 @@ def search_by_author(conn: sqlite3.Connection, term: str) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors
         FROM authors_fts fts
         JOIN authors a ON a.id = fts.rowid
@@ -83,7 +126,6 @@ def search_by_year(conn: sqlite3.Connection, year: int) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors
         FROM books b
         LEFT JOIN book_authors ba ON ba.book_id = b.id
@@ -102,7 +144,6 @@ def browse_by_title(conn: sqlite3.Connection) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors
         FROM books b
         LEFT JOIN book_authors ba ON ba.book_id = b.id
@@ -120,7 +161,6 @@ def browse_by_year(conn: sqlite3.Connection) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors
         FROM books b
         LEFT JOIN book_authors ba ON ba.book_id = b.id
@@ -138,7 +178,6 @@ def browse_by_author(conn: sqlite3.Connection) -> list[sqlite3.Row]:
             b.id,
             b.title,
             b.publication_year,
-            b.description,
             GROUP_CONCAT(DISTINCT a.name) AS authors,
             MIN(a.name) AS sort_author
         FROM books b
@@ -150,41 +189,332 @@ def browse_by_author(conn: sqlite3.Connection) -> list[sqlite3.Row]:
     return conn.execute(query).fetchall()
 
 
-def browse(db_path: Path | None, field: str) -> str:
+def facet_decades(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Return (decade, count) for every decade with books, oldest first."""
+    query = "SELECT decade, count FROM decade_counts ORDER BY decade"
+    return conn.execute(query).fetchall()
+
+
+def facet_years(conn: sqlite3.Connection, decade: int | None = None) -> list[sqlite3.Row]:
+    """Return (year, count) for every year with books, optionally within one decade."""
+    if decade is None:
+        query = "SELECT year, count FROM year_counts ORDER BY year"
+        return conn.execute(query).fetchall()
+    query = "SELECT year, count FROM year_counts WHERE year BETWEEN ? AND ? ORDER BY year"
+    return conn.execute(query, (decade, decade + 9)).fetchall()
+
+
+def facet_authors(conn: sqlite3.Connection, limit: int | None = None) -> list[sqlite3.Row]:
+    """Return (id, name, count) for authors, most books first."""
+    query = """
+        SELECT a.id, a.name, ac.count
+        FROM author_counts ac
+        JOIN authors a ON a.id = ac.author_id
+        ORDER BY ac.count DESC
+        LIMIT ?
     """
-    Browse all books ordered by the specified field.
+    return conn.execute(query, (limit if limit is not None else -1,)).fetchall()
 
-    Args:
-        db_path: Path to database, or None for default.
-        field: One of 'title', 'author', 'year'.
 
-    Returns:
-        Formatted string of results.
+def facet_publishers(conn: sqlite3.Connection, limit: int | None = None) -> list[sqlite3.Row]:
+    """Return (id, name, count) for publishers, most books first."""
+    query = """
+        SELECT p.id, p.name, pc.count
+        FROM publisher_counts pc
+        JOIN publishers p ON p.id = pc.publisher_id
+        ORDER BY pc.count DESC
+        LIMIT ?
+    """
+    return conn.execute(query, (limit if limit is not None else -1,)).fetchall()
+
+
+def decode_description(description: str | bytes | None, compressed: int) -> str | None:
+    """Return a book_details description as text, decompressing if needed."""
+    if description is None:
+        return None
+    if compressed:
+        description = zlib.decompress(description)
+    if isinstance(description, bytes):
+        description = description.decode("utf-8")
+    return description
+
+
+def get_book_details(conn: sqlite3.Connection, book_id: int) -> dict | None:
+    """
+    Load the full record for one book.
+
+    Returns a dict with the list columns plus isbn, publishers,
+    publication_date, description and open_library_key, or None if the
+    book does not exist.
+    """
+    query = """
+        SELECT
+            b.id,
+            b.isbn,
+            b.title,
+            b.publication_year,
+            d.publication_date,
+            d.description,
+            d.description_compressed,
+            d.open_library_key,
+            (SELECT GROUP_CONCAT(a.name, ', ')
+             FROM book_authors ba JOIN authors a ON a.id = ba.author_id
+             WHERE ba.book_id = b.id) AS authors,
+            (SELECT GROUP_CONCAT(p.name, ', ')
+             FROM book_publishers bp JOIN publishers p ON p.id = bp.publisher_id
+             WHERE bp.book_id = b.id) AS publishers
+        FROM books b
+        LEFT JOIN book_details d ON d.book_id = b.id
+        WHERE b.id = ?
+    """
+    row = conn.execute(query, (book_id,)).fetchone()
+    if row is None:
+        return None
+
+    details = dict(row)
+    details["description"] = decode_description(
+        details["description"], details.pop("description_compressed")
+    )
+    return details
+
+
+def search_books(db_path: Path | None, field: str, term: str) -> list[sqlite3.Row]:
+    """
+    Search the catalog by field and return list rows.
+
+    Raises ValueError for an unknown field.
     """
     conn = get_connection(db_path)
     try:
         if field == "title":
-            results = browse_by_title(conn)
+            return search_by_title(conn, term)
         elif field == "author":
-            results = browse_by_author(conn)
+            return search_by_author(conn, term)
         elif field == "year":
-            results = browse_by_year(conn)
-        else:
-            return f"Unknown browse field: {field}"
+            return search_by_year(conn, int(term))
+        raise ValueError(f"Unknown search field: {field}")
+    finally:
+        conn.close()
+
+
+def browse_books(db_path: Path | None, field: str) -> list[sqlite3.Row]:
+    """
+    Return all books ordered by field as list rows.
 
-        return format_results(results)
+    Raises ValueError for an unknown field.
+    """
+    conn = get_connection(db_path)
+    try:
+        if field == "title":
+            return browse_by_title(conn)
+        elif field == "author":
+            return browse_by_author(conn)
+        elif field == "year":
+            return browse_by_year(conn)
+        raise ValueError(f"Unknown browse field: {field}")
     finally:
         conn.close()
 
 
-def truncate_description(desc: str | None, max_len: int = 100) -> str:
-    """Truncate description to fit terminal display."""
-    if not desc:
-        return "No description available"
-    desc = desc.strip()
-    if len(desc) <= max_len:
-        return desc
-    return desc[:max_len].rsplit(" ", 1)[0] + "..."
+def book_details(db_path: Path | None, book_id: int) -> dict | None:
+    """Load the full record for one book (see get_book_details)."""
+    conn = get_connection(db_path)
+    try:
+        return get_book_details(conn, book_id)
+    finally:
+        conn.close()
+
+
+def decade_counts(db_path: Path | None) -> list[sqlite3.Row]:
+    """Return (decade, count) for every decade with books (see facet_decades)."""
+    conn = get_connection(db_path)
+    try:
+        return facet_decades(conn)
+    finally:
+        conn.close()
+
+
+def year_counts(db_path: Path | None, decade: int) -> list[sqlite3.Row]:
+    """Return (year, count) for every year with books within one decade."""
+    conn = get_connection(db_path)
+    try:
+        return facet_years(conn, decade)
+    finally:
+        conn.close()
+
+
+# Columns of a batch lookup result, in CSV order
+BATCH_COLUMNS = ["input", "found", "id", "isbn", "title", "authors", "publication_year"]
+
+
+def normalize_isbn(isbn: str) -> str:
+    """
+    Reduce an ISBN to a comparable form.
+
+    Strips hyphens, spaces and other separators and converts ISBN-10 to
+    ISBN-13, so scanned EAN barcodes match however the ISBN was stored.
+    Values that are not ISBNs are returned with separators stripped.
+    """
+    digits = re.sub(r"[^0-9X]", "", (isbn or "").upper())
+    if len(digits) == 10:
+        body = "978" + digits[:9]
+        total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(body))
+        return body + str((10 - total % 10) % 10)
+    return digits
+
+
+def isbn_forms(isbn: str) -> list[str]:
+    """
+    The plain forms an ISBN may be stored in: ISBN-13, and ISBN-10 for 978 ISBNs.
+
+    Non-ISBN values come back as their single stripped form.
+    """
+    key = normalize_isbn(isbn)
+    forms = [key]
+    if len(key) == 13 and key.startswith("978"):
+        body = key[3:12]
+        check = (11 - sum((10 - i) * int(d) for i, d in enumerate(body)) % 11) % 11
+        forms.append(body + ("X" if check == 10 else str(check)))
+    return forms
+
+
+def batch_lookup(conn: sqlite3.Connection, field: str, values: list[str]) -> list[dict]:
+    """
+    Resolve many ISBNs, titles or author names in one query.
+
+    The inputs go into a temporary table that is joined against the
+    catalog, so the cost is one statement rather than one per value.
+    ISBNs are entered in both their ISBN-10 and ISBN-13 forms and looked
+    up through the unique isbn index. Stored ISBNs that are not plain
+    digits (hyphens, dashes) are found with a scan of that index and
+    entered as they are stored. Titles and authors use the same FTS5
+    phrase-prefix match as search_by_title()/search_by_author().
+
+    Returns one dict per match (keys as BATCH_COLUMNS), in input order;
+    an input with no match gets a single row with found=False.
+    """
+    if field == "isbn":
+        keys = [(position, form) for position, value in enumerate(values)
+                for form in isbn_forms(value)]
+        positions = {}
+        for position, form in keys:
+            positions.setdefault(form, []).append(position)
+        for (stored,) in conn.execute("SELECT isbn FROM books WHERE isbn GLOB '*[^0-9X]*'"):
+            for position in positions.get(normalize_isbn(stored), []):
+                keys.append((position, stored))
+        query = """
+            SELECT DISTINCT l.position, b.id, b.isbn, b.title, b.publication_year
+            FROM batch_input l
+            JOIN books b ON b.isbn = l.key
+            ORDER BY l.position
+        """
+    elif field == "title":
+        keys = [(position, '"{}"*'.format(v.replace('"', '""')))
+                for position, v in enumerate(values)]
+        query = """
+            SELECT l.position, b.id, b.isbn, b.title, b.publication_year
+            FROM batch_input l
+            JOIN books_fts fts ON books_fts MATCH l.key
+            JOIN books b ON b.id = fts.rowid
+            ORDER BY l.position, fts.rank
+        """
+    elif field == "author":
+        keys = [(position, '"{}"*'.format(v.replace('"', '""')))
+                for position, v in enumerate(values)]
+        query = """
+            SELECT DISTINCT l.position, b.id, b.isbn, b.title, b.publication_year
+            FROM batch_input l
+            JOIN authors_fts fts ON authors_fts MATCH l.key
+            JOIN book_authors ba ON ba.author_id = fts.rowid
+            JOIN books b ON b.id = ba.book_id
+            ORDER BY l.position, b.title
+        """
+    else:
+        raise ValueError(f"Unknown batch field: {field}")
+
+    conn.execute("DROP TABLE IF EXISTS temp.batch_input")
+    conn.execute("CREATE TEMP TABLE batch_input (position INTEGER NOT NULL, key TEXT NOT NULL)")
+    conn.execute("CREATE INDEX temp.idx_batch_input_key ON batch_input(key)")
+    try:
+        conn.executemany("INSERT INTO batch_input (position, key) VALUES (?, ?)", keys)
+        rows = conn.execute(query).fetchall()
+
+        authors = {}
+        book_ids = {row[1] for row in rows}
+        if book_ids:
+            conn.execute("CREATE TEMP TABLE batch_books (id INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT INTO batch_books (id) VALUES (?)", ((i,) for i in book_ids))
+            authors = dict(conn.execute("""
+                SELECT ba.book_id, GROUP_CONCAT(a.name)
+                FROM batch_books bb
+                JOIN book_authors ba ON ba.book_id = bb.id
+                JOIN authors a ON a.id = ba.author_id
+                GROUP BY ba.book_id
+            """).fetchall())
+            conn.execute("DROP TABLE temp.batch_books")
+    finally:
+        conn.execute("DROP TABLE temp.batch_input")
+
+    matches = {}
+    for position, book_id, isbn, title, year in rows:
+        matches.setdefault(position, []).append({
+            "found": True,
+            "id": book_id,
+            "isbn": isbn,
+            "title": title,
+            "authors": authors.get(book_id),
+            "publication_year": year,
+        })
+
+    results = []
+    for position, value in enumerate(values):
+        for match in matches.get(position, [{"found": False}]):
+            result = dict.fromkeys(BATCH_COLUMNS)
+            result.update(match, input=value)
+            results.append(result)
+    return results
+
+
+def read_batch_values(lines) -> list[str]:
+    """Read one value per line, skipping blank lines and # comments."""
+    values = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            values.append(line)
+    return values
+
+
+def write_batch_results(results: list[dict], out, output_format: str) -> None:
+    """Write batch lookup results as JSON Lines or CSV."""
+    if output_format == "csv":
+        import csv
+
+        writer = csv.DictWriter(out, fieldnames=BATCH_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        import json
+
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+
+
+def browse(db_path: Path | None, field: str) -> str:
+    """
+    Browse all books ordered by the specified field.
+
+    Args:
+        db_path: Path to database, or None for default.
+        field: One of 'title', 'author', 'year'.
+
+    Returns:
+        Formatted string of results.
+    """
+    try:
+        return format_results(browse_books(db_path, field))
+    except ValueError as e:
+        return str(e)
 
 
 def format_results(results: list[sqlite3.Row]) -> str:
@@ -200,7 +530,6 @@ def format_results(results: list[sqlite3.Row]) -> str:
         lines.append(f"Title:   {row['title']}")
         lines.append(f"Author:  {row['authors'] or 'Unknown'}")
         lines.append(f"Year:    {row['publication_year'] or 'Unknown'}")
-        lines.append(f"Desc:    {truncate_description(row['description'])}")
         lines.append("-" * 60)
 
     return "\n".join(lines)
@@ -218,34 +547,25 @@ def search(db_path: Path | None, field: str, term: str) -> str:
     Returns:
         Formatted string of results.
     """
-    conn = get_connection(db_path)
-    try:
-        if field == "title":
-            results = search_by_title(conn, term)
-        elif field == "author":
-            results = search_by_author(conn, term)
-        elif field == "year":
-            results = search_by_year(conn, int(term))
-        else:
-            return f"Unknown search field: {field}"
-
-        return format_results(results)
-    finally:
-        conn.close()
+    if field not in ("title", "author", "year"):
+        return f"Unknown search field: {field}"
+    return format_results(search_books(db_path, field, term))
 
 
 def main():
     """Command-line interface for search."""
     import argparse
+    import sys
 
     parser = argparse.ArgumentParser(description="Search the library database.")
     parser.add_argument(
         "field",
-        choices=["title", "author", "year"],
-        help="Field to search by"
+        choices=["title", "author", "year", "isbn"],
+        help="Field to search by (isbn only with --batch)"
     )
     parser.add_argument(
         "term",
+        nargs="?",
         help="Search term"
     )
     parser.add_argument(
@@ -254,9 +574,50 @@ def main():
         default=None,
         help=f"Path to database (default: {DEFAULT_DB_PATH})"
     )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Look up every value in FILE (one per line, '-' for stdin) in one pass"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="Output format for --batch (default: jsonl)"
+    )
 
     args = parser.parse_args()
-    print(search(args.db, args.field, args.term))
+
+    if args.batch is None:
+        if args.field == "isbn":
+            parser.error("isbn lookups need --batch")
+        if args.term is None:
+            parser.error("a search term is required")
+        print(search(args.db, args.field, args.term))
+        return
+
+    if args.field == "year":
+        parser.error("--batch supports isbn, title and author")
+    if args.batch == "-":
+        values = read_batch_values(sys.stdin)
+    elif not Path(args.batch).exists():
+        print(f"Error: Batch file not found at {args.batch}", file=sys.stderr)
+        sys.exit(1)
+    else:
+        with open(args.batch, "r") as f:
+            values = read_batch_values(f)
+
+    conn = get_connection(args.db)
+    try:
+        results = batch_lookup(conn, args.field, values)
+    finally:
+        conn.close()
+    write_batch_results(results, sys.stdout, args.format)
+
+    # Each input without a match has exactly one row, so count per input
+    missing = sum(1 for r in results if not r["found"])
+    found = len(values) - missing
+    print(f"{len(values)} looked up, {found} found, {missing} missing", file=sys.stderr)
 
 
 if __name__ == "__main__":
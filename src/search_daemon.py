@@ -0,0 +1,511 @@
+"""
+Shared local search daemon.
+
+Runs search.py behind a Unix domain socket so several terminals (or a web
+kiosk) share warm database connections and one result cache, instead of
+each process opening its own connection with cold caches.
+
+Protocol: one JSON object per line in each direction.
+    request:  {"op": "search", "field": "title", "term": "tale"}
+              {"op": "browse", "field": "year"}
+              {"op": "details", "id": 42}
+              {"op": "facets", "field": "decade"}
+              {"op": "facets", "field": "year", "term": "1990"}
+              {"op": "search", "field": "title", "term": "tale", "cache": false}
+    response: {"ok": true, "result": ...} or {"ok": false, "error": "...", "kind": "..."}
+
+Search and browse results are lists of list rows (id, title, authors,
+publication_year); details is the full record of one book, or null;
+facets are (decade, count) or (year, count) rows. "cache": false skips
+the result cache (used by the load test to time the queries themselves).
+An error's kind is "invalid" for a bad request (e.g. a year that is not
+a number) and "failed" when the query itself failed.
+
+Usage:
+    python search_daemon.py serve [--pool-size 4]
+    python search_daemon.py loadtest --clients 8 --requests 200
+"""
+
+import json
+import os
+import queue
+import random
+import re
+import socket
+import sqlite3
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from search import (
+    DEFAULT_DB_PATH,
+    browse_by_author,
+    browse_by_title,
+    browse_by_year,
+    facet_decades,
+    facet_years,
+    get_book_details,
+    search_by_author,
+    search_by_title,
+    search_by_year,
+)
+
+
+DEFAULT_SOCKET_PATH = Path(__file__).parent / "db" / "search.sock"
+
+# Number of results kept in the shared cache
+CACHE_SIZE = 256
+
+# Database connections opened at startup and shared by all clients
+POOL_SIZE = 4
+
+
+class ResultCache:
+    """Thread-safe LRU cache of results, cleared when the database changes."""
+
+    def __init__(self, db_path: Path, size: int = CACHE_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.version = None
+
+    def db_version(self) -> tuple:
+        """Modification times of the database and its WAL, if any."""
+        version = []
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            try:
+                version.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def get(self, key: tuple) -> object | None:
+        """Return a cached result, or None on a miss."""
+        version = self.db_version()
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            return None
+
+    def put(self, key: tuple, result: object) -> None:
+        """Cache a result, evicting the least recently used entry if full."""
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+class SearchHandler(socketserver.StreamRequestHandler):
+    """Serves requests from one client connection."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.execute(request)}
+            except ValueError as e:
+                response = {"ok": False, "error": str(e), "kind": "invalid"}
+            except Exception as e:
+                response = {"ok": False, "error": str(e), "kind": "failed"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded Unix socket server sharing a fixed pool of warm connections.
+
+    Each client gets a handler thread, but queries borrow one of the
+    pool's connections, so a new client never starts with a cold
+    connection and the number of open connections stays fixed.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, db_path: Path, pool_size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.cache = ResultCache(db_path)
+        if socket_path.exists():
+            if daemon_running(socket_path):
+                raise RuntimeError(f"A search daemon is already running on {socket_path}")
+            socket_path.unlink()  # Left behind by a daemon that did not shut down cleanly
+        super().__init__(str(socket_path), SearchHandler)
+
+        self.pool = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # Load the schema
+            self.pool.put(conn)
+
+    def close_pool(self) -> None:
+        """Close the pooled connections that are not in use."""
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def execute(self, request: dict) -> list[dict] | dict | None:
+        """Run a search, browse, details or facets request and return its result."""
+        op = request.get("op")
+        field = request.get("field")
+        term = request.get("term")
+        book_id = request.get("id")
+        key = (op, field, term, book_id)
+        use_cache = request.get("cache", True)
+
+        result = self.cache.get(key) if use_cache else None
+        if result is not None:
+            return result
+
+        # Wait for a free connection; return it however the query ends
+        conn = self.pool.get()
+        try:
+            result = self.query(conn, op, field, term, book_id)
+        finally:
+            self.pool.put(conn)
+
+        if result is not None and use_cache:
+            self.cache.put(key, result)
+        return result
+
+    def query(self, conn: sqlite3.Connection, op: str, field: str, term: str,
+              book_id) -> list[dict] | dict | None:
+        """Run one request against a database connection."""
+        if op == "search":
+            if field == "title":
+                rows = search_by_title(conn, term)
+            elif field == "author":
+                rows = search_by_author(conn, term)
+            elif field == "year":
+                rows = search_by_year(conn, int(term))
+            else:
+                raise ValueError(f"Unknown search field: {field}")
+            result = [dict(row) for row in rows]
+        elif op == "browse":
+            if field == "title":
+                rows = browse_by_title(conn)
+            elif field == "author":
+                rows = browse_by_author(conn)
+            elif field == "year":
+                rows = browse_by_year(conn)
+            else:
+                raise ValueError(f"Unknown browse field: {field}")
+            result = [dict(row) for row in rows]
+        elif op == "details":
+            result = get_book_details(conn, int(book_id))
+        elif op == "facets":
+            if field == "decade":
+                rows = facet_decades(conn)
+            elif field == "year":
+                rows = facet_years(conn, int(term))
+            else:
+                raise ValueError(f"Unknown facet: {field}")
+            result = [dict(row) for row in rows]
+        else:
+            raise ValueError(f"Unknown op: {op}")
+        return result
+
+
+def daemon_running(socket_path: Path) -> bool:
+    """Check whether a daemon is accepting connections on a socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(socket_path: Path, db_path: Path, pool_size: int = POOL_SIZE) -> None:
+    """Run the daemon until interrupted."""
+    with SearchServer(socket_path, db_path, pool_size) as server:
+        print(f"Serving {db_path} on {socket_path} with {pool_size} connections")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close_pool()
+            socket_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class DaemonClient:
+    """Persistent connection to the search daemon."""
+
+    def __init__(self, socket_path: Path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(socket_path))
+        self.rfile = self.sock.makefile("rb")
+
+    def request(self, request: dict) -> list[dict] | dict | None:
+        """
+        Send a request and return its result.
+
+        Raises OSError if the connection is lost, ValueError if the daemon
+        rejects the request as invalid, RuntimeError for other errors.
+        """
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionResetError("search daemon closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            if response.get("kind") == "invalid":
+                raise ValueError(response["error"])
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def close(self):
+        """Close the connection."""
+        self.rfile.close()
+        self.sock.close()
+
+
+# One client per socket path, so a UI process reuses its connection
+_clients = {}
+
+
+def get_client(socket_path: Path | None = None) -> DaemonClient:
+    """Return the (cached) client for a socket path."""
+    if socket_path is None:
+        socket_path = DEFAULT_SOCKET_PATH
+    key = str(socket_path)
+    if key not in _clients:
+        _clients[key] = DaemonClient(socket_path)
+    return _clients[key]
+
+
+def drop_client(socket_path: Path | None = None) -> None:
+    """Close and forget the cached client for a socket path."""
+    if socket_path is None:
+        socket_path = DEFAULT_SOCKET_PATH
+    client = _clients.pop(str(socket_path), None)
+    if client is not None:
+        try:
+            client.close()
+        except OSError:
+            pass
+
+
+def daemon_request(socket_path: Path | None, request: dict) -> list[dict] | dict | None:
+    """
+    Send a request over the cached client.
+
+    If the connection has gone away (daemon restarted), reconnects once
+    and retries. Raises OSError if the daemon cannot be reached.
+    """
+    try:
+        return get_client(socket_path).request(request)
+    except OSError:
+        drop_client(socket_path)
+    try:
+        return get_client(socket_path).request(request)
+    except OSError:
+        drop_client(socket_path)
+        raise
+
+
+def search_books(socket_path: Path | None, field: str, term: str) -> list[dict]:
+    """Daemon equivalent of search.search_books()."""
+    return daemon_request(socket_path, {"op": "search", "field": field, "term": term})
+
+
+def browse_books(socket_path: Path | None, field: str) -> list[dict]:
+    """Daemon equivalent of search.browse_books()."""
+    return daemon_request(socket_path, {"op": "browse", "field": field})
+
+
+def book_details(socket_path: Path | None, book_id: int) -> dict | None:
+    """Daemon equivalent of search.book_details()."""
+    return daemon_request(socket_path, {"op": "details", "id": book_id})
+
+
+def decade_counts(socket_path: Path | None) -> list[dict]:
+    """Daemon equivalent of search.decade_counts()."""
+    return daemon_request(socket_path, {"op": "facets", "field": "decade"})
+
+
+def year_counts(socket_path: Path | None, decade: int) -> list[dict]:
+    """Daemon equivalent of search.year_counts()."""
+    return daemon_request(socket_path, {"op": "facets", "field": "year", "term": str(decade)})
+
+
+# =============================================================================
+# LOAD TEST
+# =============================================================================
+
+# Books sampled from the catalog for load test terms; four requests each,
+# so the whole set fits in the result cache for the cached run
+LOADTEST_BOOKS = (CACHE_SIZE - 3) // 4
+
+
+def prefix(text: str | None, rng: random.Random) -> str | None:
+    """The first three letters of a random word of the text."""
+    words = [w for w in re.findall(r"\w+", text or "") if len(w) >= 3]
+    return rng.choice(words)[:3] if words else None
+
+
+def loadtest_requests(socket_path: Path, seed: int = 0) -> list[dict]:
+    """
+    Build a varied request mix from the catalog itself.
+
+    For a sample of books: a title prefix search, an author prefix search,
+    a search for the book's year and its details; plus the three browses.
+    """
+    rng = random.Random(seed)
+    client = DaemonClient(socket_path)
+    try:
+        books = client.request({"op": "browse", "field": "title"})
+    finally:
+        client.close()
+
+    requests = [{"op": "browse", "field": field} for field in ("title", "author", "year")]
+    for book in rng.sample(books, min(LOADTEST_BOOKS, len(books))):
+        for field, text in (("title", book["title"]), ("author", book["authors"])):
+            term = prefix(text, rng)
+            if term:
+                requests.append({"op": "search", "field": field, "term": term})
+        if book["publication_year"]:
+            requests.append({"op": "search", "field": "year",
+                             "term": str(book["publication_year"])})
+        requests.append({"op": "details", "id": book["id"]})
+    return requests
+
+
+def run_load(socket_path: Path, requests: list[dict], clients: int,
+             requests_per_client: int) -> None:
+    """Send requests from concurrent terminals and report throughput and latency."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def terminal(n):
+        # Each terminal works through the mix in its own order
+        mix = requests[:]
+        random.Random(n).shuffle(mix)
+        client = DaemonClient(socket_path)
+        mine = []
+        try:
+            for i in range(requests_per_client):
+                start = time.perf_counter()
+                try:
+                    client.request(mix[i % len(mix)])
+                except Exception as e:
+                    with lock:
+                        errors.append(str(e))
+                mine.append(time.perf_counter() - start)
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=terminal, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"  Requests:    {total} ({len(errors)} errors)")
+    print(f"  Elapsed:     {elapsed:.3f}s")
+    print(f"  Throughput:  {total / elapsed:.0f} requests/s")
+    if latencies:
+        print(f"  Latency:     p50={latencies[total // 2] * 1000:.2f}ms "
+              f"p95={latencies[int(total * 0.95)] * 1000:.2f}ms "
+              f"max={latencies[-1] * 1000:.2f}ms")
+
+
+def load_test(socket_path: Path, clients: int, requests_per_client: int) -> None:
+    """
+    Simulate concurrent terminals, first uncached, then from the result cache.
+
+    The uncached run bypasses the cache, so it measures the queries
+    themselves; the cached run measures the daemon's overhead on a hit.
+    """
+    requests = loadtest_requests(socket_path)
+    print(f"Clients:   {clients}")
+    print(f"Requests:  {len(requests)} distinct, terms sampled from the catalog")
+
+    print("Uncached (every request runs its query):")
+    run_load(socket_path, [dict(r, cache=False) for r in requests], clients,
+             requests_per_client)
+
+    # Fill the cache, then measure hits only
+    client = DaemonClient(socket_path)
+    try:
+        for request in requests:
+            client.request(request)
+    finally:
+        client.close()
+    print("Cached (every request is a result cache hit):")
+    run_load(socket_path, requests, clients, requests_per_client)
+
+
+def main():
+    """Command-line interface for the search daemon."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared library search daemon.")
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Path to Unix socket (default: {DEFAULT_SOCKET_PATH})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon")
+    serve_parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Path to database (default: {DEFAULT_DB_PATH})"
+    )
+    serve_parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=POOL_SIZE,
+        help=f"Database connections shared by all clients (default: {POOL_SIZE})"
+    )
+
+    load_parser = subparsers.add_parser("loadtest", help="Simulate concurrent terminals")
+    load_parser.add_argument("--clients", type=int, default=8, help="Concurrent terminals")
+    load_parser.add_argument("--requests", type=int, default=200, help="Requests per terminal")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if not args.db.exists():
+            print(f"Error: Database not found at {args.db}")
+            sys.exit(1)
+        try:
+            serve(args.socket, args.db, args.pool_size)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.command == "loadtest":
+        load_test(args.socket, args.clients, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Compact read-only catalog snapshot.
+
+The ui-box only ever reads the catalog. This module exports the database
+into an immutable binary file of array-backed columns (titles, years,
+author ids), pre-sorted permutation indexes for title, author and year
+order, and sorted token tables used as a prefix index. The reader
+memory-maps the file and serves the same search_books()/browse_books()
+API as search.py straight from the mapped pages, without SQLite or Row
+objects. Like search.py's list queries it holds only id, title, authors and year;
+book details are read from the database.
+
+Usage:
+    python snapshot.py --db db/library.db --out db/library.snap
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from search import DEFAULT_DB_PATH, get_connection
+
+
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent / "db" / "library.snap"
+
+MAGIC = b"LIBSNAP2"
+
+# Sections in file order. Each is an array of the given typecode
+# ('B' sections are raw UTF-8 string data).
+SECTIONS = [
+    ("title_offsets", "I"),
+    ("title_data", "B"),
+    ("book_ids", "q"),
+    ("years", "i"),
+    ("book_author_offsets", "I"),
+    ("book_authors", "I"),
+    ("author_name_offsets", "I"),
+    ("author_name_data", "B"),
+    ("author_book_offsets", "I"),
+    ("author_books", "I"),
+    ("order_title", "I"),
+    ("order_author", "I"),
+    ("order_year", "I"),
+    ("title_token_offsets", "I"),
+    ("title_token_data", "B"),
+    ("title_posting_offsets", "I"),
+    ("title_postings", "I"),
+    ("author_token_offsets", "I"),
+    ("author_token_data", "B"),
+    ("author_posting_offsets", "I"),
+    ("author_postings", "I"),
+]
+
+# magic, byte order, book count, author count, then (offset, length) per section
+HEADER = struct.Struct("<8s8sII" + "QQ" * len(SECTIONS))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase, accent-free tokens (like FTS5 unicode61)."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.findall(r"\w+", text.casefold())
+
+
+def sort_key(text: str | None) -> str:
+    """Case-insensitive sort key."""
+    return (text or "").casefold()
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def string_table(strings: list[str]) -> tuple[array, bytes]:
+    """Pack strings into an offsets array and a UTF-8 data blob."""
+    offsets = array("I", [0])
+    data = bytearray()
+    for s in strings:
+        data += s.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, bytes(data)
+
+
+def csr(lists: list[list[int]]) -> tuple[array, array]:
+    """Pack a list of integer lists into offsets and values arrays."""
+    offsets = array("I", [0])
+    values = array("I")
+    for items in lists:
+        values.extend(items)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def token_index(texts: list[str], ids: list[int]) -> tuple[array, bytes, array, array]:
+    """Build a sorted token table with a posting list of ids per token."""
+    postings = {}
+    for text, item_id in zip(texts, ids):
+        for token in set(tokenize(text)):
+            postings.setdefault(token, []).append(item_id)
+    tokens = sorted(postings)
+    token_offsets, token_data = string_table(tokens)
+    posting_offsets, posting_values = csr([sorted(postings[t]) for t in tokens])
+    return token_offsets, token_data, posting_offsets, posting_values
+
+
+def export_snapshot(db_path: Path | None, snapshot_path: Path) -> int:
+    """
+    Write a snapshot of the catalog database.
+
+    Returns the number of books written.
+    """
+    conn = get_connection(db_path)
+    try:
+        books = conn.execute("""
+            SELECT id, title, publication_year
+            FROM books
+            ORDER BY id
+        """).fetchall()
+        authors = conn.execute("SELECT id, name FROM authors ORDER BY id").fetchall()
+        links = conn.execute("SELECT book_id, author_id FROM book_authors").fetchall()
+    finally:
+        conn.close()
+
+    # Snapshot ids are positions in the books/authors lists
+    book_index = {row["id"]: i for i, row in enumerate(books)}
+    author_index = {row["id"]: i for i, row in enumerate(authors)}
+    author_names = [row["name"] for row in authors]
+
+    book_authors = [[] for _ in books]
+    author_books = [[] for _ in authors]
+    for link in links:
+        b = book_index.get(link["book_id"])
+        a = author_index.get(link["author_id"])
+        if b is None or a is None:
+            continue
+        book_authors[b].append(a)
+        author_books[a].append(b)
+
+    titles = [row["title"] for row in books]
+    years = [row["publication_year"] or 0 for row in books]
+
+    def first_author(b):
+        names = [author_names[a] for a in book_authors[b]]
+        return sort_key(min(names)) if names else ""
+
+    positions = range(len(books))
+    sections = {}
+    sections["title_offsets"], sections["title_data"] = string_table(titles)
+    sections["book_ids"] = array("q", [row["id"] for row in books])
+    sections["years"] = array("i", years)
+    sections["book_author_offsets"], sections["book_authors"] = csr(book_authors)
+    sections["author_name_offsets"], sections["author_name_data"] = string_table(author_names)
+    sections["author_book_offsets"], sections["author_books"] = csr(author_books)
+    sections["order_title"] = array("I", sorted(positions, key=lambda b: sort_key(titles[b])))
+    sections["order_author"] = array("I", sorted(
+        positions, key=lambda b: (first_author(b), sort_key(titles[b]))
+    ))
+    sections["order_year"] = array("I", sorted(
+        positions, key=lambda b: (years[b], sort_key(titles[b]))
+    ))
+    (sections["title_token_offsets"], sections["title_token_data"],
+     sections["title_posting_offsets"], sections["title_postings"]) = token_index(
+        titles, list(positions)
+    )
+    (sections["author_token_offsets"], sections["author_token_data"],
+     sections["author_posting_offsets"], sections["author_postings"]) = token_index(
+        author_names, list(range(len(authors)))
+    )
+
+    # Lay sections out after the header, 8-byte aligned
+    offset = HEADER.size
+    layout = []
+    blobs = []
+    for name, _ in SECTIONS:
+        blob = sections[name]
+        blob = blob.tobytes() if isinstance(blob, array) else blob
+        offset += -offset % 8
+        layout.extend([offset, len(blob)])
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    header = HEADER.pack(MAGIC, sys.byteorder.encode().ljust(8, b"\0"),
+                         len(books), len(authors), *layout)
+    tmp_path = Path(snapshot_path).with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section_offset, blob in blobs:
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(blob)
+    tmp_path.replace(snapshot_path)
+
+    return len(books)
+
+
+# =============================================================================
+# READER
+# =============================================================================
+
+class StringTable:
+    """Sequence view over a packed string table; decodes on access."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class Snapshot:
+    """A memory-mapped catalog snapshot."""
+
+    def __init__(self, snapshot_path: Path):
+        with open(snapshot_path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.version = file_version(os.fstat(f.fileno()))
+
+        if len(self.mm) < HEADER.size:
+            raise ValueError(f"Not a catalog snapshot: {snapshot_path}")
+        fields = HEADER.unpack_from(self.mm, 0)
+        magic, byteorder, self.book_count, self.author_count = fields[:4]
+        if magic != MAGIC:
+            raise ValueError(f"Not a catalog snapshot: {snapshot_path}")
+        if byteorder.rstrip(b"\0").decode() != sys.byteorder:
+            raise ValueError(f"Snapshot byte order does not match this machine: {snapshot_path}")
+
+        view = memoryview(self.mm)
+        layout = fields[4:]
+        s = {}
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, length = layout[2 * i], layout[2 * i + 1]
+            s[name] = view[offset:offset + length].cast(typecode)
+
+        self.titles = StringTable(s["title_offsets"], s["title_data"])
+        self.book_ids = s["book_ids"]
+        self.years = s["years"]
+        self.book_author_offsets = s["book_author_offsets"]
+        self.book_authors = s["book_authors"]
+        self.author_names = StringTable(s["author_name_offsets"], s["author_name_data"])
+        self.author_book_offsets = s["author_book_offsets"]
+        self.author_books = s["author_books"]
+        self.orders = {
+            "title": s["order_title"],
+            "author": s["order_author"],
+            "year": s["order_year"],
+        }
+        self.title_tokens = StringTable(s["title_token_offsets"], s["title_token_data"])
+        self.title_posting_offsets = s["title_posting_offsets"]
+        self.title_postings = s["title_postings"]
+        self.author_tokens = StringTable(s["author_token_offsets"], s["author_token_data"])
+        self.author_posting_offsets = s["author_posting_offsets"]
+        self.author_postings = s["author_postings"]
+
+    def book(self, b: int) -> dict:
+        """Return a result row for a book, shaped like search.py's rows."""
+        start, end = self.book_author_offsets[b], self.book_author_offsets[b + 1]
+        names = [self.author_names[a] for a in self.book_authors[start:end]]
+        return {
+            "id": self.book_ids[b],
+            "title": self.titles[b],
+            "publication_year": self.years[b] or None,
+            "authors": ",".join(names) or None,
+        }
+
+    def match_tokens(self, tokens: StringTable, offsets: memoryview,
+                     postings: memoryview, words: list[str]) -> set[int]:
+        """
+        Return candidate ids from the prefix index for a tokenized term.
+
+        Candidates come from the first word's postings (prefix-matched for
+        a single word); callers confirm them with phrase_matches().
+        """
+        if not words:
+            return set()
+
+        # Candidates from the posting lists of the first word
+        first = words[0]
+        lo = bisect_left(tokens, first)
+        if len(words) == 1:
+            hi = bisect_left(tokens, first + "\U0010ffff")
+        else:
+            hi = bisect_right(tokens, first)
+        candidates = set()
+        for t in range(lo, hi):
+            candidates.update(postings[offsets[t]:offsets[t + 1]])
+        return candidates
+
+    def phrase_matches(self, text: str, words: list[str]) -> bool:
+        """
+        Check that text contains words in order, the last as a prefix.
+
+        Mirrors the FTS5 query '"term"*' used by search.py.
+        """
+        text_words = tokenize(text)
+        n = len(words)
+        for i in range(len(text_words) - n + 1):
+            window = text_words[i:i + n]
+            if window[:-1] == words[:-1] and window[-1].startswith(words[-1]):
+                return True
+        return False
+
+    def search_by_title(self, term: str) -> list[dict]:
+        """Search book titles by phrase prefix."""
+        words = tokenize(term)
+        candidates = self.match_tokens(self.title_tokens, self.title_posting_offsets,
+                                       self.title_postings, words)
+        books = [b for b in candidates if self.phrase_matches(self.titles[b], words)]
+        books.sort(key=lambda b: sort_key(self.titles[b]))
+        return [self.book(b) for b in books]
+
+    def search_by_author(self, term: str) -> list[dict]:
+        """Search author names by phrase prefix and return their books."""
+        words = tokenize(term)
+        candidates = self.match_tokens(self.author_tokens, self.author_posting_offsets,
+                                       self.author_postings, words)
+        books = set()
+        for a in candidates:
+            if self.phrase_matches(self.author_names[a], words):
+                start, end = self.author_book_offsets[a], self.author_book_offsets[a + 1]
+                books.update(self.author_books[start:end])
+        ordered = sorted(books, key=lambda b: sort_key(self.titles[b]))
+        return [self.book(b) for b in ordered]
+
+    def search_by_year(self, year: int) -> list[dict]:
+        """Return books published in the given year, using the year order."""
+        order = self.orders["year"]
+        years = YearView(order, self.years)
+        lo = bisect_left(years, year)
+        hi = bisect_right(years, year)
+        return [self.book(b) for b in order[lo:hi]]
+
+    def browse(self, field: str) -> list[dict]:
+        """Return all books in the pre-sorted order for a field."""
+        return [self.book(b) for b in self.orders[field]]
+
+
+class YearView:
+    """Sequence of publication years in year order, for binary search."""
+
+    def __init__(self, order: memoryview, years: memoryview):
+        self.order = order
+        self.years = years
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.years[self.order[i]]
+
+
+def file_version(st: os.stat_result) -> tuple:
+    """Identify a snapshot file; a rebuild replaces it with a new inode."""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def snapshot_version(snapshot_path: Path | None = None) -> tuple:
+    """Version of the snapshot file currently at a path."""
+    return file_version(os.stat(snapshot_path or DEFAULT_SNAPSHOT_PATH))
+
+
+# Open snapshots by path, so each process maps a file once per version
+_snapshots = {}
+
+
+def open_snapshot(snapshot_path: Path | None = None) -> Snapshot:
+    """Return the (cached) snapshot for a path, remapping it if it was rebuilt."""
+    if snapshot_path is None:
+        snapshot_path = DEFAULT_SNAPSHOT_PATH
+    key = str(snapshot_path)
+    snap = _snapshots.get(key)
+    if snap is None or snap.version != snapshot_version(snapshot_path):
+        snap = _snapshots[key] = Snapshot(snapshot_path)
+    return snap
+
+
+def warm_snapshot(snapshot_path: Path | None = None) -> int:
+    """Map the snapshot and touch every page so it is resident. Returns its size."""
+    snap = open_snapshot(snapshot_path)
+    for offset in range(0, len(snap.mm), mmap.PAGESIZE):
+        snap.mm[offset]
+    return len(snap.mm)
+
+
+def search_books(snapshot_path: Path | None, field: str, term: str) -> list[dict]:
+    """Snapshot equivalent of search.search_books()."""
+    snap = open_snapshot(snapshot_path)
+    if field == "title":
+        return snap.search_by_title(term)
+    elif field == "author":
+        return snap.search_by_author(term)
+    elif field == "year":
+        return snap.search_by_year(int(term))
+    raise ValueError(f"Unknown search field: {field}")
+
+
+def browse_books(snapshot_path: Path | None, field: str) -> list[dict]:
+    """Snapshot equivalent of search.browse_books()."""
+    if field not in ("title", "author", "year"):
+        raise ValueError(f"Unknown browse field: {field}")
+    return open_snapshot(snapshot_path).browse(field)
+
+
+def main():
+    """Export a snapshot from the catalog database."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Export the library database to a read-only snapshot."
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"Path to database (default: {DEFAULT_DB_PATH})"
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=DEFAULT_SNAPSHOT_PATH,
+        help=f"Path to snapshot file (default: {DEFAULT_SNAPSHOT_PATH})"
+    )
+    args = parser.parse_args()
+
+    count = export_snapshot(args.db, args.out)
+    print(f"Wrote {count} books to {args.out} ({args.out.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
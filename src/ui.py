@@ -4,14 +4,27 @@ Library terminal user interface.
 A green-screen TUI for searching the library catalog.
 """
 
+import time
+
+# Taken before any other import so startup timings include import cost
+BOOT_TIME = time.perf_counter()
+
 import curses
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
-from search import search, browse
+# The query backends (search, snapshot, search_daemon) and autocomplete
+# are imported on first use, so the menu is drawn without waiting for them
+
+IMPORT_SECONDS = time.perf_counter() - BOOT_TIME
 
 
 DB_PATH = Path(__file__).parent / "db" / "library.db"
 
+# Book detail records kept in memory for going back and forth in a list
+DETAIL_CACHE_SIZE = 32
+
 # Menu options
 SEARCH_OPTIONS = [
     ("search_title", "Search by Title"),
@@ -23,15 +36,148 @@ BROWSE_OPTIONS = [
     ("browse_title", "Browse by Title"),
     ("browse_author", "Browse by Author"),
     ("browse_year", "Browse by Year"),
+    ("browse_decade", "Browse by Decade"),
 ]
 
 
+def warm_catalog(snapshot_path: Path | None):
+    """Warm the snapshot, or the database if there is none. Errors are ignored."""
+    import sqlite3
+
+    try:
+        if snapshot_path:
+            from snapshot import warm_snapshot
+            warm_snapshot(snapshot_path)
+        else:
+            from search import warm_cache
+            warm_cache(DB_PATH)
+    except (sqlite3.Error, OSError, ValueError):
+        pass  # Warming only speeds up the first query
+
+
+def start_warmup(snapshot_path: Path | None) -> threading.Thread:
+    """Warm the catalog page cache in a background thread."""
+    thread = threading.Thread(target=warm_catalog, args=(snapshot_path,), daemon=True)
+    thread.start()
+    return thread
+
+
 class LibraryUI:
-    def __init__(self, stdscr):
+    def __init__(self, stdscr, timing_log: Path | None = None,
+                 snapshot_path: Path | None = None, daemon_socket: Path | None = None):
         self.stdscr = stdscr
         self.last_search = None  # (field, term) tuple
+        self.timing_log = timing_log
+        self.snapshot_path = snapshot_path
+        self.daemon_socket = daemon_socket
+        self.search_fn = None  # Set by load_backend()
+        # Cached details are dropped when version_fn reports a rebuilt snapshot
+        self.detail_cache = OrderedDict()
+        self.detail_version = None
+
+        self.interactive = False
+        self.first_query_done = False
         self.setup_colors()
 
+        # Build the autocomplete index in the background. Thin clients
+        # have no local database to index, so they go without suggestions.
+        self.autocomplete = None  # Created by the first update
+        self.autocomplete_lock = threading.Lock()
+        self.autocomplete_db = None if daemon_socket else DB_PATH
+        self.refresh_autocomplete()
+
+    def load_backend(self):
+        """Import the query backend, the first time a menu option is chosen."""
+        if self.search_fn is not None:
+            return
+
+        # Query backend: the SQLite database, a read-only snapshot,
+        # or a shared search daemon (thin client mode). Lists come from
+        # the backend; book details from the daemon or the database.
+        if self.daemon_socket:
+            import search_daemon
+            self.source = self.daemon_socket
+            self.search_fn = search_daemon.search_books
+            self.browse_fn = search_daemon.browse_books
+            self.version_fn = None
+            self.details_source = self.daemon_socket
+            self.details_fn = search_daemon.book_details
+            self.facet_source = self.daemon_socket
+            self.decades_fn = search_daemon.decade_counts
+            self.years_fn = search_daemon.year_counts
+        elif self.snapshot_path:
+            import search
+            import snapshot
+            self.source = self.snapshot_path
+            self.search_fn = snapshot.search_books
+            self.browse_fn = snapshot.browse_books
+            self.version_fn = snapshot.snapshot_version
+            self.details_source = DB_PATH
+            self.details_fn = search.book_details
+            self.facet_source = DB_PATH
+            self.decades_fn = search.decade_counts
+            self.years_fn = search.year_counts
+        else:
+            import search
+            self.source = DB_PATH
+            self.search_fn = search.search_books
+            self.browse_fn = search.browse_books
+            self.version_fn = None
+            self.details_source = DB_PATH
+            self.details_fn = search.book_details
+            self.facet_source = DB_PATH
+            self.decades_fn = search.decade_counts
+            self.years_fn = search.year_counts
+
+    def refresh_autocomplete(self):
+        """Update the autocomplete index in the background."""
+        if self.autocomplete_db is not None:
+            threading.Thread(target=self.update_autocomplete, daemon=True).start()
+
+    def update_autocomplete(self):
+        """Index books and authors added since the last update, unless an update is running."""
+        if not self.autocomplete_lock.acquire(blocking=False):
+            return
+        try:
+            if not self.autocomplete_db.exists():
+                return
+            import sqlite3
+            from autocomplete import Autocomplete
+            from search import get_connection
+
+            if self.autocomplete is None:
+                self.autocomplete = Autocomplete()
+            conn = get_connection(self.autocomplete_db)
+            try:
+                self.autocomplete.update(conn)
+            except sqlite3.Error:
+                pass  # Suggestions are optional
+            finally:
+                conn.close()
+        finally:
+            self.autocomplete_lock.release()
+
+    def suggest(self, field: str, term: str) -> list[str] | None:
+        """Return suggestions, or None while the index is being updated."""
+        if not self.autocomplete_lock.acquire(blocking=False):
+            return None
+        try:
+            if self.autocomplete is None:
+                return []
+            return self.autocomplete.suggest(field, term)
+        finally:
+            self.autocomplete_lock.release()
+
+    def record_timing(self, event: str, seconds: float):
+        """Append a startup timing event to the timing log, if enabled."""
+        if self.timing_log is None:
+            return
+        import json
+
+        entry = {"event": event, "seconds": round(seconds, 4), "time": time.time()}
+        with open(self.timing_log, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
     def setup_colors(self):
         """Initialize green-on-black color scheme."""
         curses.start_color()
@@ -105,6 +251,11 @@ class LibraryUI:
 
             self.stdscr.refresh()
 
+            if not self.interactive:
+                self.interactive = True
+                self.record_timing("import", IMPORT_SECONDS)
+                self.record_timing("boot_to_interactive", time.perf_counter() - BOOT_TIME)
+
             ch = self.stdscr.getch()
             if ch == curses.KEY_UP:
                 # Find previous selectable item
@@ -121,9 +272,11 @@ class LibraryUI:
 
     def get_search_input(self, field: str) -> str | None:
         """Prompt user for search term. Returns None if cancelled."""
+        self.refresh_autocomplete()
+
         self.stdscr.clear()
         self.draw_header()
-        self.draw_footer(" [Enter] Search  [Esc] Cancel ")
+        self.draw_footer(" [Enter] Search  [Tab] Complete  [Esc] Cancel ")
 
         height, width = self.stdscr.getmaxyx()
         prompt = f"Enter {field}: "
@@ -139,7 +292,14 @@ class LibraryUI:
         input_win.bkgd(' ', curses.color_pair(1))
 
         term = ""
+        suggestions = []
         while True:
+            # Keep the previous suggestions while the index is busy
+            latest = self.suggest(field, term)
+            if latest is not None:
+                suggestions = latest
+            self.draw_suggestions(suggestions)
+
             input_win.clear()
             input_win.addstr(0, 0, term)
             input_win.refresh()
@@ -153,11 +313,82 @@ class LibraryUI:
                 curses.curs_set(0)
                 curses.noecho()
                 return term if term.strip() else None
+            elif ch == 9:  # Tab
+                if suggestions:
+                    term = suggestions[0]
             elif ch in (curses.KEY_BACKSPACE, 127, 8):
                 term = term[:-1]
             elif 32 <= ch <= 126:  # Printable ASCII
                 term += chr(ch)
 
+    def draw_suggestions(self, suggestions: list[str]):
+        """Draw autocomplete suggestions under the input line."""
+        from autocomplete import DEFAULT_LIMIT as SUGGESTION_LIMIT
+
+        height, width = self.stdscr.getmaxyx()
+        for i in range(SUGGESTION_LIMIT):
+            y = 5 + i
+            if y >= height - 1:
+                break
+            self.stdscr.move(y, 0)
+            self.stdscr.clrtoeol()
+            if i < len(suggestions):
+                self.stdscr.addstr(y, 4, suggestions[i][:width - 6], curses.A_DIM)
+        self.stdscr.refresh()
+
+    def show_choice_menu(self, title: str, items: list[tuple],
+                         selected: int = 0) -> object | None:
+        """
+        Display a scrollable list of (key, label) items.
+
+        Returns the selected key, or None if the user backs out.
+        """
+        scroll_pos = 0
+
+        while True:
+            self.stdscr.clear()
+            self.draw_header()
+            self.draw_footer(" [↑/↓] Navigate  [Enter] Select  [Q] Back ")
+
+            height, width = self.stdscr.getmaxyx()
+            self.stdscr.addstr(2, 2, title[:width - 3], curses.A_BOLD)
+            visible_lines = height - 5
+
+            # Keep the selection on screen
+            if selected < scroll_pos:
+                scroll_pos = selected
+            elif selected >= scroll_pos + visible_lines:
+                scroll_pos = selected - visible_lines + 1
+
+            for i, (key, label) in enumerate(items[scroll_pos:scroll_pos + visible_lines]):
+                y = 4 + i
+                if scroll_pos + i == selected:
+                    self.stdscr.attron(curses.color_pair(2))
+                    self.stdscr.addstr(y, 2, f" {label} "[:width - 3])
+                    self.stdscr.attroff(curses.color_pair(2))
+                else:
+                    self.stdscr.addstr(y, 4, label[:width - 5])
+
+            self.stdscr.refresh()
+
+            ch = self.stdscr.getch()
+            if ch == curses.KEY_UP and selected > 0:
+                selected -= 1
+            elif ch == curses.KEY_DOWN and selected < len(items) - 1:
+                selected += 1
+            elif ch == curses.KEY_PPAGE:  # Page Up
+                selected = max(0, selected - visible_lines)
+            elif ch == curses.KEY_NPAGE:  # Page Down
+                selected = max(0, min(len(items) - 1, selected + visible_lines))
+            elif ch == ord('u'):  # Half-page up
+                selected = max(0, selected - visible_lines // 2)
+            elif ch == ord('d'):  # Half-page down
+                selected = max(0, min(len(items) - 1, selected + visible_lines // 2))
+            elif ch in (curses.KEY_ENTER, 10, 13) and items:
+                return items[selected][0]
+            elif ch in (27, ord('q'), ord('Q')):
+                return None
+
     def show_results(self, results_text: str):
         """Display search results with scrolling."""
         lines = results_text.split('\n')
@@ -207,10 +438,97 @@ class LibraryUI:
             elif key in (curses.KEY_ENTER, 10, 13, ord('q'), ord('Q')):
                 return
 
+    def show_book_list(self, title: str, rows: list):
+        """Display a list of books; Enter opens the details of one book."""
+        if not rows:
+            self.show_results("No books found.")
+            return
+
+        items = [
+            (i, f"{row['title']} - {row['authors'] or 'Unknown'}"
+                f" ({row['publication_year'] or 'Unknown'})")
+            for i, row in enumerate(rows)
+        ]
+        selected = 0
+        while True:
+            selected = self.show_choice_menu(f"{title}: {len(rows)} book(s)", items, selected)
+            if selected is None:
+                return
+            self.show_book_details(rows[selected])
+
+    def load_details(self, book_id: int) -> dict | None:
+        """Return the full record for a book, from the detail cache if possible."""
+        if self.version_fn is not None:
+            version = self.version_fn(self.source)
+            if version != self.detail_version:
+                self.detail_cache.clear()
+                self.detail_version = version
+
+        if book_id in self.detail_cache:
+            self.detail_cache.move_to_end(book_id)
+            return self.detail_cache[book_id]
+
+        details = self.details_fn(self.details_source, book_id)
+        if details is not None:
+            self.detail_cache[book_id] = details
+            while len(self.detail_cache) > DETAIL_CACHE_SIZE:
+                self.detail_cache.popitem(last=False)
+        return details
+
+    def show_book_details(self, row):
+        """Load and display the full record for one book."""
+        import sqlite3
+        import textwrap
+
+        try:
+            details = self.load_details(row["id"])
+        except (sqlite3.Error, OSError, RuntimeError):
+            details = None
+        if details is None:
+            self.show_results(f"{row['title']}\n\nDetails are not available.")
+            return
+
+        height, width = self.stdscr.getmaxyx()
+        lines = [
+            f"Title:      {details['title']}",
+            f"Author:     {details['authors'] or 'Unknown'}",
+            f"Year:       {details['publication_year'] or 'Unknown'}",
+            f"Published:  {details['publication_date'] or 'Unknown'}",
+            f"Publisher:  {details['publishers'] or 'Unknown'}",
+            f"ISBN:       {details['isbn'] or 'Unknown'}",
+            "-" * 60,
+        ]
+        description = details["description"] or "No description available."
+        for paragraph in description.splitlines():
+            lines.extend(textwrap.wrap(paragraph, max(20, width - 2)) or [""])
+        self.show_results("\n".join(lines))
+
+    def run_query(self, query, *args):
+        """
+        Run a backend query, showing an error screen instead of crashing.
+
+        Returns None if the query failed (e.g. the search daemon is down).
+        """
+        import sqlite3
+
+        try:
+            return query(*args)
+        except ValueError:
+            self.show_results("Invalid search term.")
+        except (OSError, RuntimeError, sqlite3.Error) as e:
+            self.show_results(f"The catalog is not available right now.\n\n{e}")
+        return None
+
     def do_search(self, field: str, term: str):
         """Execute search and display results."""
         # Cache this search
         self.last_search = (field, term)
+        if self.autocomplete_lock.acquire(blocking=False):
+            try:
+                if self.autocomplete is not None:
+                    self.autocomplete.record_use(field, term)
+            finally:
+                self.autocomplete_lock.release()
 
         # Show loading message
         self.stdscr.clear()
@@ -219,8 +537,11 @@ class LibraryUI:
         self.stdscr.refresh()
 
         # Execute search
-        results_text = search(DB_PATH, field, term)
-        self.show_results(results_text)
+        start = time.perf_counter()
+        rows = self.run_query(self.search_fn, self.source, field, term)
+        self.record_first_query(time.perf_counter() - start)
+        if rows is not None:
+            self.show_book_list(f"{field.capitalize()} '{term}'", rows)
 
     def do_browse(self, field: str):
         """Execute browse and display results."""
@@ -231,8 +552,56 @@ class LibraryUI:
         self.stdscr.refresh()
 
         # Execute browse
-        results_text = browse(DB_PATH, field)
-        self.show_results(results_text)
+        start = time.perf_counter()
+        rows = self.run_query(self.browse_fn, self.source, field)
+        self.record_first_query(time.perf_counter() - start)
+        if rows is not None:
+            self.show_book_list(f"Browse by {field.capitalize()}", rows)
+
+    def load_facets(self, query, *args):
+        """Run a facet query, explaining what to do if the facet tables are missing."""
+        import sqlite3
+
+        try:
+            return query(self.facet_source, *args)
+        except (sqlite3.OperationalError, RuntimeError) as e:
+            if "no such table" not in str(e):
+                raise
+            self.show_results("Decade browsing needs the facet tables (run db/migrate_facets.py).")
+            return None
+
+    def do_browse_decades(self):
+        """Drill down from decades to years to the books of one year."""
+        # The daemon reports its own errors; locally, don't create an empty database
+        if self.facet_source == DB_PATH and not DB_PATH.exists():
+            self.show_results("Catalog database not found.")
+            return
+        while True:
+            rows = self.run_query(self.load_facets, self.decades_fn)
+            if rows is None:
+                return
+            decades = [(row["decade"], f"{row['decade']}s  ({row['count']})") for row in rows]
+            decade = self.show_choice_menu("Browse by Decade", decades)
+            if decade is None:
+                return
+
+            while True:
+                rows = self.run_query(self.load_facets, self.years_fn, decade)
+                if rows is None:
+                    break
+                years = [(row["year"], f"{row['year']}  ({row['count']})") for row in rows]
+                year = self.show_choice_menu(f"The {decade}s", years)
+                if year is None:
+                    break
+                rows = self.run_query(self.search_fn, self.source, "year", str(year))
+                if rows is not None:
+                    self.show_book_list(str(year), rows)
+
+    def record_first_query(self, seconds: float):
+        """Record the latency of the first query after startup."""
+        if not self.first_query_done:
+            self.first_query_done = True
+            self.record_timing("first_query", seconds)
 
     def run(self):
         """Main UI loop."""
@@ -240,6 +609,7 @@ class LibraryUI:
 
         while True:
             choice = self.show_main_menu()
+            self.load_backend()
 
             if choice == "repeat":
                 if self.last_search:
@@ -250,16 +620,56 @@ class LibraryUI:
                 term = self.get_search_input(field)
                 if term:
                     self.do_search(field, term)
+            elif choice == "browse_decade":
+                self.do_browse_decades()
             elif choice.startswith("browse_"):
                 field = choice.replace("browse_", "")
                 self.do_browse(field)
 
 
-def main(stdscr):
+def main(stdscr, args):
     """Entry point for curses wrapper."""
-    ui = LibraryUI(stdscr)
+    ui = LibraryUI(stdscr, timing_log=args.timing_log, snapshot_path=args.snapshot,
+                   daemon_socket=args.daemon)
     ui.run()
 
 
 if __name__ == "__main__":
-    curses.wrapper(main)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Library catalog terminal UI.")
+    parser.add_argument(
+        "--no-warm",
+        action="store_true",
+        help="Skip warming the database cache in the background at startup"
+    )
+    parser.add_argument(
+        "--timing-log",
+        type=Path,
+        default=None,
+        help="Append startup timings (import, boot-to-interactive, first query) as JSON lines"
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        default=None,
+        help="Serve queries from a read-only catalog snapshot (see snapshot.py)"
+    )
+    parser.add_argument(
+        "--daemon",
+        type=Path,
+        default=None,
+        help="Send queries to a running search daemon at this socket (see search_daemon.py)"
+    )
+    args = parser.parse_args()
+
+    # Fall back to the database until a snapshot has been built
+    if args.snapshot and not args.snapshot.exists():
+        args.snapshot = None
+
+    # Warm the catalog while curses initializes and draws the menu
+    # (the daemon keeps its own caches warm)
+    if not args.no_warm and not args.daemon:
+        start_warmup(args.snapshot)
+
+    curses.wrapper(main, args)
@@ -0,0 +1,6 @@
+"""Test setup: the modules under src/ import each other as top-level modules."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
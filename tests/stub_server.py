@@ -0,0 +1,109 @@
+"""
+Stub Open Library server for exercising rate control.
+
+Each request is answered with the next (status, headers) pair from a
+script; once the script runs out, requests get 200 and a small JSON
+document. Tests start it on a free port with StubServer; it can also be
+run on its own to point ingestion at a misbehaving server:
+
+    python tests/stub_server.py --mode throttle --port 8080
+    OPEN_LIBRARY_API=http://localhost:8080 python src/ingest.py --output /tmp/stub.json
+
+Write the output somewhere else: the stub's records would otherwise
+replace the real src/data/output.json.
+
+Modes:
+    throttle     429 with Retry-After on every third request
+    unavailable  503 with Retry-After on every request
+    error        500 on every request
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers GET requests from the server's script."""
+
+    def do_GET(self):
+        status, headers = self.server.next_response(self.path)
+        body = b""
+        if status == 200:
+            body = json.dumps({"key": self.path.removesuffix(".json"), "title": "Stub"}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Scripted HTTP server running in a background thread."""
+
+    def __init__(self, script=(), port: int = 0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.script = iter(script)
+        self.lock = threading.Lock()
+        self.requests = []  # (monotonic time, path) of every request
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def next_response(self, path: str) -> tuple[int, dict]:
+        """Log a request and return the scripted (status, headers) for it."""
+        with self.lock:
+            self.requests.append((time.monotonic(), path))
+            return next(self.script, (200, {}))
+
+    def request_gaps(self) -> list[float]:
+        """Seconds between consecutive requests."""
+        times = [t for t, _ in self.requests]
+        return [b - a for a, b in zip(times, times[1:])]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+MODES = {
+    "throttle": lambda: itertools.cycle([(200, {}), (200, {}), (429, {"Retry-After": "1"})]),
+    "unavailable": lambda: itertools.repeat((503, {"Retry-After": "1"})),
+    "error": lambda: itertools.repeat((500, {})),
+}
+
+
+def main():
+    """Run the stub server until interrupted."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stub Open Library server.")
+    parser.add_argument("--mode", choices=sorted(MODES), default="throttle",
+                        help="How the server misbehaves (default: throttle)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    args = parser.parse_args()
+
+    server = StubServer(MODES[args.mode](), args.port)
+    print(f"Serving '{args.mode}' stub on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Tests for offline ingestion from Open Library dumps, using the fixtures in fixtures/dumps."""
+
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+from ingest_dumps import build_index, open_index, resolve_isbn, uncovered_isbns
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "dumps"
+
+AWAKENING = {
+    "title": "The Awakening and Selected Stories",
+    "authors": ["Kate Chopin"],
+    "publication_date": "1986",
+    "publishers": ["Penguin Classics"],
+    "description": "A woman awakens to her own desires.",
+    "open_library_key": "/books/OL1M",
+}
+
+INHERITANCE = {
+    "title": "The Inheritance of Loss",
+    "authors": ["Kiran Desai"],
+    "publication_date": "2006",
+    "publishers": ["Penguin Books"],
+    "description": "Life in a crumbling house in the Himalayas.",
+    "open_library_key": "/books/OL2M",
+}
+
+
+def build(tmp_path, isbns=None, dumps=FIXTURES):
+    conn = open_index(tmp_path / "index.db")
+    build_index(conn, dumps / "editions.txt", dumps / "works.txt", dumps / "authors.txt", isbns)
+    return conn
+
+
+@pytest.mark.parametrize("isbn", ["0140390227", "9780140390223"])
+def test_resolves_isbn10_and_isbn13_forms(tmp_path, isbn):
+    # The edition only lists an ISBN-10; authors come from the work
+    conn = build(tmp_path)
+    assert resolve_isbn(conn, isbn) == {"isbn": isbn, **AWAKENING}
+
+
+@pytest.mark.parametrize("isbn", ["9780141028729", "0141028726"])
+def test_resolves_hyphenated_isbn13_editions(tmp_path, isbn):
+    # Edition-level authors, plain-string description, publisher objects
+    conn = build(tmp_path)
+    assert resolve_isbn(conn, isbn) == {"isbn": isbn, **INHERITANCE}
+
+
+def test_unknown_isbn_is_not_found(tmp_path):
+    conn = build(tmp_path)
+    assert resolve_isbn(conn, "9780000000002") is None
+
+
+def test_filtered_index_matches_other_isbn_form(tmp_path):
+    conn = build(tmp_path, isbns={"9780140390223"})
+    assert resolve_isbn(conn, "9780140390223") == {"isbn": "9780140390223", **AWAKENING}
+    assert resolve_isbn(conn, "9780141028729") is None
+
+
+def test_filtered_index_reports_uncovered_isbns(tmp_path):
+    conn = build(tmp_path, isbns={"0140390227"})
+    assert uncovered_isbns(conn, ["9780140390223"]) == []
+    assert uncovered_isbns(conn, ["0140390227", "9780141028729"]) == ["9780141028729"]
+
+    # Rebuilding with more ISBNs extends what the index covers
+    build_index(conn, FIXTURES / "editions.txt", FIXTURES / "works.txt",
+                FIXTURES / "authors.txt", {"9780141028729"})
+    assert uncovered_isbns(conn, ["0140390227", "9780141028729"]) == []
+
+
+def test_full_index_covers_everything(tmp_path):
+    conn = build(tmp_path)
+    assert uncovered_isbns(conn, ["9780000000002"]) == []
+
+
+def test_older_index_is_rejected(tmp_path):
+    conn = open_index(tmp_path / "index.db")
+    with pytest.raises(ValueError):
+        uncovered_isbns(conn, ["0140390227"])
+
+
+def test_reads_gzip_dumps(tmp_path):
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    for name in ("editions", "works", "authors"):
+        with open(FIXTURES / f"{name}.txt", "rb") as src, \
+                gzip.open(dumps / f"{name}.txt.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+    conn = open_index(tmp_path / "index.db")
+    build_index(conn, dumps / "editions.txt.gz", dumps / "works.txt.gz",
+                dumps / "authors.txt.gz")
+    assert resolve_isbn(conn, "0140390227") == {"isbn": "0140390227", **AWAKENING}
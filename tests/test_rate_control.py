@@ -0,0 +1,70 @@
+"""Tests for adaptive rate control, running get_json against the stub server."""
+
+import pytest
+import requests
+
+import ingest
+import rate_control
+from ingest import get_json, make_session
+from rate_control import CircuitOpenError, RateController
+from stub_server import StubServer
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    # Keep retries and cooldowns short enough for a test run
+    monkeypatch.setattr(rate_control, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(rate_control, "FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(rate_control, "COOLDOWN_SECONDS", 0.2)
+    monkeypatch.setattr(rate_control, "MAX_COOLDOWN_SECONDS", 0.3)
+
+
+def fetch(server, rate):
+    return get_json(make_session(), f"{server.url}/isbn/0140390227.json", "edition", rate=rate)
+
+
+def test_retry_after_is_honored():
+    with StubServer([(429, {"Retry-After": "1"})]) as server:
+        data = fetch(server, RateController(initial_rate=100, max_rate=100))
+    assert data["title"] == "Stub"
+    assert len(server.requests) == 2
+    assert server.request_gaps()[0] >= 1.0
+
+
+def test_throttling_halves_the_rate():
+    rate = RateController(initial_rate=8, max_rate=8)
+    with StubServer([(429, {"Retry-After": "0"}), (503, {"Retry-After": "0"})]) as server:
+        fetch(server, rate)
+    # Halved twice, then one additive increase for the final success
+    assert rate.rate == pytest.approx(2 + rate_control.ADDITIVE_INCREASE)
+    assert rate.consecutive_failures == 0
+
+
+def test_throttled_after_max_retries_is_not_a_success(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_RETRIES", 1)
+    rate = RateController(initial_rate=8, max_rate=8)
+    with StubServer([(429, {"Retry-After": "0"})] * 2) as server:
+        with pytest.raises(requests.HTTPError):
+            fetch(server, rate)
+    assert rate.rate == 4
+    assert rate.consecutive_failures == 1
+
+
+def test_not_found_counts_as_success():
+    rate = RateController(initial_rate=1, max_rate=8)
+    with StubServer([(404, {})]) as server:
+        assert fetch(server, rate) is None
+    assert rate.rate == pytest.approx(1 + rate_control.ADDITIVE_INCREASE)
+
+
+@pytest.mark.parametrize("status", [500, 503])
+def test_sustained_failures_open_the_circuit(status, capsys):
+    rate = RateController(initial_rate=100, max_rate=100)
+    with StubServer([(status, {"Retry-After": "0"})] * 10) as server:
+        with pytest.raises(CircuitOpenError):
+            fetch(server, rate)
+    # Opens on the third failure and pauses for the cooldown, then gives
+    # up when the next failure would need a cooldown past the maximum
+    assert len(server.requests) == 4
+    assert server.request_gaps()[2] >= 0.2
+    assert "pausing requests" in capsys.readouterr().out